@@ -10,8 +10,11 @@ from routes.complaints import bp as complaints_bp
 from routes.scholarships import bp as scholarships_bp
 from routes.ncert_questions import bp as ncert_questions_bp
 from routes.language_routes import bp as language_bp
+from routes.metrics import bp as metrics_bp
+from routes.tts_stream import bp as tts_bp
 from helpers.llm import generate_embeddings, generate_response, find_similarities
-from helpers.chroma_helpers import init_all_collections
+from helpers.chroma_helpers import start_background_indexing
+from helpers.aio import ensure_sync
 
 # Load environment variables
 load_dotenv()
@@ -20,14 +23,19 @@ app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY')
 CORS(app) 
 
-# Initialize ChromaDB collections at startup
-init_all_collections()
+# Async views run on one shared event loop per process (see helpers/aio.py)
+app.ensure_sync = ensure_sync
+
+# Index ChromaDB collections in the background; queries build a dataset on first use if needed
+start_background_indexing()
 
 app.register_blueprint(nearby_schools_bp)
 app.register_blueprint(complaints_bp)
 app.register_blueprint(scholarships_bp)
 app.register_blueprint(ncert_questions_bp)
 app.register_blueprint(language_bp)
+app.register_blueprint(metrics_bp)
+app.register_blueprint(tts_bp)
 
 @app.route('/')
 def index():
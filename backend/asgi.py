@@ -0,0 +1,6 @@
+import os
+from a2wsgi import WSGIMiddleware
+from app import app
+
+# ASGI entry point: `uvicorn asgi:asgi_app` (see serve.py for the production launcher)
+asgi_app = WSGIMiddleware(app, workers=int(os.getenv("BACKEND_THREADS", "32")))
@@ -0,0 +1,111 @@
+"""Recall, latency and memory of the in-process NumPy index against Chroma.
+
+Queries are stored dataset vectors with Gaussian noise added, so no Ollama
+calls are needed. Ground truth is exact cosine top-k in float64. Run from
+the backend directory once the datasets are indexed:
+
+    python -m benchmarks.vector_search --dataset ncert_books --queries 200 --top-k 5
+
+Set VECTOR_RERANK_FACTOR to trade int8 recall for scan cost.
+"""
+import time
+import argparse
+import statistics
+import numpy as np
+from helpers.chroma_helpers import chroma_client, embedding_fn, ensure_collection, export_embeddings
+from helpers.vector_index import VectorIndex
+
+
+def exact_top_k(matrix: np.ndarray, queries: np.ndarray, top_k: int) -> list:
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True).clip(min=1e-12)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True).clip(min=1e-12)
+    scores = queries @ matrix.T
+    return [set(row) for row in np.argsort(-scores, axis=1)[:, :top_k]]
+
+
+def recall(found: list, truth: list) -> float:
+    return statistics.mean(len(f & t) / len(t) for f, t in zip(found, truth))
+
+
+def percentile(samples: list, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def report(name: str, latencies: list, found: list, truth: list):
+    print(
+        f"{name:>14}: recall@k {recall(found, truth):.4f} | "
+        f"p50 {percentile(latencies, 0.5):7.2f} ms, p99 {percentile(latencies, 0.99):7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", default="ncert_books")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--noise", type=float, default=0.05, help="noise scale relative to vector norm")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    ensure_collection(args.dataset)
+    collection = chroma_client.get_collection(name=args.dataset, embedding_function=embedding_fn)
+    ids, embeddings = export_embeddings(collection)
+    matrix = np.asarray(embeddings, dtype=np.float64)
+    position = {id_: i for i, id_ in enumerate(ids)}
+    print(f"{args.dataset}: {len(ids)} vectors, dim {matrix.shape[1]}")
+
+    rng = np.random.default_rng(args.seed)
+    picks = rng.choice(len(ids), size=min(args.queries, len(ids)), replace=False)
+    base = matrix[picks]
+    scale = np.linalg.norm(base, axis=1, keepdims=True) / np.sqrt(matrix.shape[1])
+    queries = base + rng.normal(size=base.shape) * scale * args.noise
+    truth = exact_top_k(matrix, queries, args.top_k)
+
+    # Chroma: one HNSW query per caller turn
+    latencies, found = [], []
+    for query in queries:
+        started = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=args.top_k, include=[])
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append({position[id_] for id_ in result["ids"][0]})
+    report("chroma", latencies, found, truth)
+
+    index = VectorIndex.build(f"bench_{args.dataset}", ids, embeddings, stamp="benchmark")
+
+    # NumPy: same per-turn pattern against the memory-mapped float32 matrix
+    latencies, found = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search(query, args.top_k, exact=True)[0]
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append({position[id_] for id_, _ in hits})
+    report("numpy float32", latencies, found, truth)
+
+    # NumPy int8: scan the codes, re-rank candidates from the float32 file
+    latencies, found = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = index.search(query, args.top_k)[0]
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append({position[id_] for id_, _ in hits})
+    report("numpy int8", latencies, found, truth)
+
+    print(
+        f"{'scan memory':>14}: float32 {index.matrix.nbytes / 2**20:8.1f} MiB | "
+        f"int8 {index.resident_bytes() / 2**20:8.1f} MiB"
+    )
+
+    # NumPy batched: all queries in one int8 scan
+    started = time.perf_counter()
+    batched = index.search(queries, args.top_k)
+    elapsed = (time.perf_counter() - started) * 1000
+    found = [{position[id_] for id_, _ in hits} for hits in batched]
+    print(
+        f"{'numpy batched':>14}: recall@k {recall(found, truth):.4f} | "
+        f"{elapsed:7.2f} ms for {len(queries)} queries ({elapsed / len(queries):.3f} ms each)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import os
+import asyncio
+import inspect
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from flask import request, has_request_context
+from helpers.background_loop import LoopThread
+
+# Shared pool for the blocking stages (translation, Chroma, Ollama, TTS) that
+# async views await; one pool per process instead of one per request loop.
+STAGE_WORKERS = int(os.getenv("STAGE_WORKERS", "32"))
+_executor = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
+
+# Every async view of this process runs on this loop. It is not the TTS
+# background loop: views block on TTS through run_blocking, which would
+# deadlock if both were the same loop.
+_view_loop = LoopThread("view-loop")
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Await a blocking call off the event loop, keeping Flask's request/session context."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(context.run, fn, *args, **kwargs))
+
+
+def ensure_sync(func):
+    """Flask's ensure_sync hook: async views share one loop instead of a new loop per request."""
+    if not inspect.iscoroutinefunction(func):
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if has_request_context():
+            # Read the body here, on the request thread, so the view never waits on the socket in the loop
+            request.get_data(cache=True)
+        return _view_loop.run(func(*args, **kwargs), context=contextvars.copy_context())
+
+    return wrapper
@@ -1,77 +1,146 @@
-import base64
+"""Render every constant IVR prompt ahead of time.
+
+Run from the backend directory at deploy time:
+
+    python -m helpers.audio_samples_generator [--ivr-dir ../ivr-server] [--workers 8]
+
+Constant messages are collected from routes/*.py (and the IVR server's
+spoken prompts in app/routes and app/helpers), rendered for every voice
+in VOICE_OPTIONS and written next to a manifest.json that the handlers
+consult before synthesizing.
+"""
+import os
+import ast
+import glob
+import json
 import asyncio
-import random
-from io import BytesIO
+import argparse
 import edge_tts
+from helpers.voice_helpers import VOICE_OPTIONS, TTS_RATE
+from helpers.prompt_bank import PROMPT_BANK_DIR, MANIFEST_NAME, prompt_file_name
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Variables the route handlers use for fixed spoken replies
+PROMPT_VARIABLES = {"msg", "follow_up"}
+# Calls whose string arguments are spoken as-is
+PROMPT_CALLS = {"generate_tts_audio", "say", "say_prompt"}
+
+IVR_PROMPT_DIR = os.path.join("static", "prompts")
+IVR_LANG = "en"
+
+
+# -----------------------------
+# Message Collection
+# -----------------------------
+def _constant_strings(node):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, ast.IfExp):
+        return _constant_strings(node.body) + _constant_strings(node.orelse)
+    return []
+
+
+def collect_messages(paths):
+    messages = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            tree = ast.parse(f.read(), filename=path)
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Assign):
+                if any(isinstance(t, ast.Name) and t.id in PROMPT_VARIABLES for t in node.targets):
+                    messages.extend(_constant_strings(node.value))
+            elif isinstance(node, ast.Call):
+                func = node.func
+                name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+                if name in PROMPT_CALLS:
+                    for arg in node.args:
+                        messages.extend(_constant_strings(arg))
+
+    # Keep first-seen order, drop duplicates and blanks
+    return list(dict.fromkeys(m.strip() for m in messages if m.strip()))
+
+
+# -----------------------------
+# Rendering
+# -----------------------------
+async def _render(text, voice, path, limit):
+    if os.path.exists(path):
+        return True
+    async with limit:
+        try:
+            audio = bytearray()
+            async for chunk in edge_tts.Communicate(text, voice, rate=TTS_RATE).stream():
+                if chunk["type"] == "audio":
+                    audio.extend(chunk["data"])
+            if not audio:
+                raise ValueError("empty audio")
+            # Written under a temporary name: an interrupted run must not leave a
+            # truncated file that later runs would take as already rendered
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            print(f"[Prompt Bank Error] {voice}: '{text}' failed: {e}")
+            return False
+
+
+async def render_bank(jobs, out_dir, workers):
+    os.makedirs(out_dir, exist_ok=True)
+    limit = asyncio.Semaphore(workers)
+    results = await asyncio.gather(*(
+        _render(job["text"], job["voice"], os.path.join(out_dir, job["file"]), limit)
+        for job in jobs
+    ))
+
+    rendered = [job for job, ok in zip(jobs, results) if ok]
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump({"rate": TTS_RATE, "prompts": rendered}, f, ensure_ascii=False, indent=2)
+
+    print(f"✅ {len(rendered)}/{len(jobs)} prompts rendered into {out_dir}")
+
+
+def build_jobs(messages, languages):
+    jobs = []
+    for text in messages:
+        for lang in languages:
+            for gender, voices in VOICE_OPTIONS[lang].items():
+                for voice in voices:
+                    jobs.append({
+                        "text": text,
+                        "lang": lang,
+                        "gender": gender,
+                        "voice": voice,
+                        "file": prompt_file_name(text, voice, TTS_RATE),
+                    })
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render constant IVR prompts for every voice.")
+    parser.add_argument("--ivr-dir", default=os.path.join(BACKEND_DIR, "..", "ivr-server"))
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    route_messages = collect_messages(sorted(glob.glob(os.path.join(BACKEND_DIR, "routes", "*.py"))))
+    print(f"🔎 {len(route_messages)} constant messages found in routes/")
+    backend_jobs = build_jobs(route_messages, list(VOICE_OPTIONS))
+    asyncio.run(render_bank(backend_jobs, os.path.join(BACKEND_DIR, PROMPT_BANK_DIR), args.workers))
+
+    # Handlers and the shared helpers (e.g. the session-expired prompt) both speak prompts
+    ivr_sources = sorted(
+        glob.glob(os.path.join(args.ivr_dir, "app", "routes", "*.py"))
+        + glob.glob(os.path.join(args.ivr_dir, "app", "helpers", "*.py"))
+    )
+    if ivr_sources:
+        ivr_messages = collect_messages(ivr_sources)
+        print(f"🔎 {len(ivr_messages)} constant messages found in ivr-server")
+        ivr_jobs = build_jobs(ivr_messages, [IVR_LANG])
+        asyncio.run(render_bank(ivr_jobs, os.path.join(args.ivr_dir, IVR_PROMPT_DIR), args.workers))
+
 
-# Proper VOICE_OPTIONS structure
-VOICE_OPTIONS = {
-    'en': {
-        'female': ['en-IN-NeerjaNeural'],
-    },
-    'hi': {
-        'female': ['hi-IN-SwaraNeural'],
-    },
-    'kn': {
-        'female': ['kn-IN-SapnaNeural'],
-    }
-}
-
-# Simulate session (if not using Flask's session)
-session = {}
-
-def generate_tts_audio(text, lang='en', gender='female'):
-    text = text.strip()
-    if not text:
-        return ""
-
-    lang = lang.lower()
-    gender = gender.lower()
-
-    if lang not in VOICE_OPTIONS:
-        lang = 'en'
-    if gender not in VOICE_OPTIONS[lang]:
-        gender = 'female'
-
-    session_key = f'bot_voice_{lang}'
-    session_gender_key = f'bot_voice_gender_{lang}'
-
-    if session.get(session_key) and session.get(session_gender_key) == gender:
-        selected_voice = session[session_key]
-    else:
-        selected_voice = random.choice(VOICE_OPTIONS[lang][gender])
-        session[session_key] = selected_voice
-        session[session_gender_key] = gender
-
-    print(f"Generating TTS for: '{text}' using voice: {selected_voice}")
-
-    try:
-        return asyncio.run(_synthesize_tts(text, selected_voice))
-    except Exception as e:
-        print(f"[TTS Error] {e}")
-        return ""
-
-
-async def _synthesize_tts(text, voice):
-    try:
-        communicate = edge_tts.Communicate(text, voice, rate="+0%")
-        stream = BytesIO()
-        async for chunk in communicate.stream():
-            if chunk["type"] == "audio":
-                stream.write(chunk["data"])
-        stream.seek(0)
-        return base64.b64encode(stream.read()).decode('utf-8')
-    except Exception as e:
-        print(f"[TTS Streaming Error] {e}")
-        return ""
-
-# 🔊 Generate and save TTS audio
-msg = "Please Select a valid digit."
-audio_base64 = generate_tts_audio(msg, lang='kn')
-
-if audio_base64:
-    with open("enter_valid_digit.mp3", "wb") as f:
-        f.write(base64.b64decode(audio_base64))
-    print("enter_valid_digit.mp3 ✅")
-else:
-    print("Failed to generate audio.")
+if __name__ == "__main__":
+    main()
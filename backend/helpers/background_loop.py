@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+# -----------------------------
+# Shared Event Loops
+# -----------------------------
+# Long-lived loops per process, each running on a daemon thread. Request
+# threads hand coroutines to them instead of building a loop per call.
+class LoopThread:
+    def __init__(self, name: str):
+        self.name = name
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                self._loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                thread.start()
+        return self._loop
+
+    def submit(self, coro, context=None):
+        """Schedule a coroutine on this loop and return a concurrent Future.
+
+        With a `context` (contextvars.copy_context() from the calling thread)
+        the coroutine sees the caller's context variables, e.g. Flask's
+        request and session.
+        """
+        if context is not None:
+            coro = _run_in_context(coro, context)
+        return asyncio.run_coroutine_threadsafe(coro, self.get_loop())
+
+    def run(self, coro, timeout: float | None = None, context=None):
+        """Run a coroutine on this loop and block the calling thread for its result."""
+        future = self.submit(coro, context)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+
+async def _run_in_context(coro, context):
+    # A task copies the context that is current when it is created
+    return await context.run(asyncio.ensure_future, coro)
+
+
+_background = LoopThread("background-loop")
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    return _background.get_loop()
+
+
+def submit(coro):
+    """Schedule a coroutine on the shared loop and return a concurrent Future."""
+    return _background.submit(coro)
+
+
+def run_in_background(coro, timeout: float | None = None):
+    """Run a coroutine on the shared loop and block the calling thread for its result."""
+    return _background.run(coro, timeout)
@@ -1,10 +1,20 @@
 import os
+import json
+import time
+import hashlib
+import threading
 import chromadb
 import pandas as pd
 from tqdm import tqdm
 from typing import List
+from concurrent.futures import ThreadPoolExecutor
 from chromadb.api.types import EmbeddingFunction
-from helpers.llm import generate_embeddings
+from helpers.llm import generate_embeddings, embed_batch
+from helpers.query_embeddings import embed_query
+from helpers.vector_index import VectorIndex
+from helpers.row_store import RowStore
+from helpers.gazetteer import Gazetteer
+from helpers.lexical_index import BM25Index, reciprocal_rank_fusion
 
 # -----------------------------
 # Embedding Function Wrapper
@@ -22,78 +32,467 @@ embedding_fn = CustomEmbeddingFunction()
 # -----------------------------
 # Dataset Configuration
 # -----------------------------
+# "columns" are the fields the routes read from query results; other
+# columns stay on disk.
 datasets = {
     "karnataka_schools": {
         "path": "datasets/karnataka-schools.csv",
-        "format_row": lambda row: f"{row['school_name']} in {row['village']}, {row['block']}, {row['district']} — Category: {row['school_category']}, Type: {row['school_type']}, Status: {row['school_status']}"
+        "format_row": lambda row: f"{row['school_name']} in {row['village']}, {row['block']}, {row['district']} — Category: {row['school_category']}, Type: {row['school_type']}, Status: {row['school_status']}",
+        "columns": ["school_name", "village", "block", "district", "location", "state_mgmt", "school_category", "school_type"],
+        "gazetteer": ["village", "block", "district", "pincode"]
     },
     "indian_scholarships": {
         "path": "datasets/indian_scholarship_providers.csv",
-        "format_row": lambda row: f"{row['Name']} — Eligibility: {row['Eligibility']}, Amount: {row['Amount']}, Deadline: {row['Deadline']}, Documents: {row['Documents Required']}"
+        "format_row": lambda row: f"{row['Name']} — Eligibility: {row['Eligibility']}, Amount: {row['Amount']}, Deadline: {row['Deadline']}, Documents: {row['Documents Required']}",
+        "columns": ["Name", "Eligibility", "Amount", "Deadline", "Documents Required"]
     },
     "ncert_books": {
         "path": "datasets/NCERT_Dataset-6thTO12th.csv",
-        "format_row": lambda row: f"Topic: {row['Topic']}. Q: {row['Question']} A: {row['Answer']} | Subject: {row['subject']}, Grade: {row['grade']}, Difficulty: {row['Difficulty']}, Time: {row['EstimatedTime']}"
+        "format_row": lambda row: f"Topic: {row['Topic']}. Q: {row['Question']} A: {row['Answer']} | Subject: {row['subject']}, Grade: {row['grade']}, Difficulty: {row['Difficulty']}, Time: {row['EstimatedTime']}",
+        "columns": ["Topic", "Explanation", "Question", "Answer", "subject", "grade"]
     }
 }
 
 # -----------------------------
-# Cache for DataFrames
+# Row Stores
 # -----------------------------
-dataframes = {}
+row_stores = {}
+row_positions = {}  # dataset -> {row key: positional index in row_stores[dataset]}
+
+# -----------------------------
+# Stable Row Keys & Diffing
+# -----------------------------
+def row_keys(df) -> List[str]:
+    """Content-derived ids: identical rows get the same key across file edits and reorders."""
+    seen = {}
+    keys = []
+    for values in df.fillna("").itertuples(index=False, name=None):
+        digest = hashlib.sha1("\x1f".join(str(v).strip() for v in values).encode("utf-8")).hexdigest()[:20]
+        # Exact duplicate rows are told apart by occurrence
+        occurrence = seen.get(digest, 0)
+        seen[digest] = occurrence + 1
+        keys.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+    return keys
+
+
+def diff_row_keys(current_keys, existing_ids):
+    """Return (keys to embed, ids to delete) between a CSV and its collection."""
+    current = set(current_keys)
+    existing = set(existing_ids)
+    to_add = [key for key in current_keys if key not in existing]
+    to_delete = [id_ for id_ in existing_ids if id_ not in current]
+    return to_add, to_delete
+
+# -----------------------------
+# Index Manifest & Progress
+# -----------------------------
+# Per-dataset content hash of the CSV that was last fully indexed; an
+# unchanged file is skipped without scanning the collection's ids.
+INDEX_MANIFEST_PATH = os.path.join(".chroma", "index_manifest.json")
+INDEX_LOCK_PATH = os.path.join(".chroma", "index-{name}.lock")
+MANIFEST_LOCK_PATH = os.path.join(".chroma", "manifest.lock")
+
+indexing_progress = {
+    name: {"state": "pending", "embedded": 0, "to_embed": 0, "rows": 0, "error": None, "seconds": None}
+    for name in datasets
+}
+_dataset_locks = {name: threading.Lock() for name in datasets}
+_manifest_lock = threading.Lock()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest() -> dict:
+    try:
+        with open(INDEX_MANIFEST_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest_entry(name: str, entry: dict):
+    # Datasets index in parallel across workers; the shared manifest is rewritten under its own lock
+    with _manifest_lock, _IndexFileLock(MANIFEST_LOCK_PATH):
+        manifest = load_manifest()
+        manifest[name] = entry
+        os.makedirs(os.path.dirname(INDEX_MANIFEST_PATH), exist_ok=True)
+        tmp_path = f"{INDEX_MANIFEST_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, INDEX_MANIFEST_PATH)
+
+
+class _IndexFileLock:
+    """Cross-process file lock; one per dataset so workers never embed the same dataset at once."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.handle = open(self.path, "a")
+        try:
+            import fcntl
+            fcntl.flock(self.handle, fcntl.LOCK_EX)
+        except ImportError:
+            pass  # No flock on this platform; single-process use only
+        return self
+
+    def __exit__(self, *exc):
+        self.handle.close()
+
+# -----------------------------
+# Row Store Loading
+# -----------------------------
+def load_row_store(name, path, content_hash):
+    """Memory-map the dataset's rows, parsing the CSV only when its content changed."""
+    store = RowStore.load(name, content_hash)
+    if store is None:
+        print(f"🗂️ Building row store for '{name}'...")
+        df = pd.read_csv(path, dtype=str, on_bad_lines='skip').fillna("")
+        store = RowStore.build(name, row_keys(df), list(df.columns), df.itertuples(index=False, name=None), content_hash)
+    row_stores[name] = store
+    row_positions[name] = store.positions
+    return store
 
 # -----------------------------
 # Embedding Population
 # -----------------------------
 def populate_embeddings(name, path, formatter, batch_size: int = 100):
+    progress = indexing_progress[name]
     print(f"\n📄 Loading dataset: {name}")
-    df = pd.read_csv(path, dtype=str, on_bad_lines='skip')
-    dataframes[name] = df
+    progress["state"] = "loading"
+    content_hash = file_sha256(path)
+    store = load_row_store(name, path, content_hash)
+    progress["rows"] = len(store)
 
     collection = chroma_client.get_or_create_collection(name=name, embedding_function=embedding_fn)
 
-    df["row_id"] = df.index.astype(str)
-    existing_ids = set(collection.get()["ids"])
-    new_rows = df[~df["row_id"].isin(existing_ids)]
+    indexed = load_manifest().get(name, {})
+    if indexed.get("sha256") == content_hash and indexed.get("count") == collection.count():
+        print(f"⚠️ '{name}' unchanged since last indexing. Skipping id scan.")
+        return
+
+    existing_ids = collection.get(include=[])["ids"]
+    to_add, to_delete = diff_row_keys(store.ids, existing_ids)
+
+    if to_delete:
+        # Rows edited or removed from the CSV since the last pass
+        print(f"🧹 Removing {len(to_delete)} stale rows from '{name}'.")
+        for i in range(0, len(to_delete), 5000):
+            collection.delete(ids=to_delete[i:i + 5000])
 
-    if new_rows.empty:
+    if not to_add:
         print(f"⚠️ No new data to embed for '{name}'. Already up to date.")
+        _save_manifest_entry(name, {"sha256": content_hash, "count": collection.count(), "rows": len(store)})
         return
 
-    print(f"🧠 Found {len(new_rows)} new rows to embed and store in batches of {batch_size}.")
+    print(f"🧠 Found {len(to_add)} new rows to embed and store in batches of {batch_size}.")
+    progress["state"] = "embedding"
+    progress["to_embed"] = len(to_add)
     
-    documents = new_rows.apply(formatter, axis=1).tolist()
-    ids = new_rows["row_id"].tolist()
+    documents = [formatter(store.record(store.positions[key])) for key in to_add]
+    ids = to_add
+    complete = True
 
     for i in tqdm(range(0, len(documents), batch_size), desc=f"📦 Batching '{name}'"):
         batch_docs = documents[i:i+batch_size]
         batch_ids = ids[i:i+batch_size]
 
-        # Generate and store embeddings for this batch
-        embeddings = generate_embeddings(batch_docs)
-        if len(embeddings) == len(batch_docs):
-            collection.add(documents=batch_docs, embeddings=embeddings, ids=batch_ids)
+        # Embeddings come back in input order, with None where a row failed
+        embeddings = embed_batch(batch_docs)
+        stored = [(e, id_, doc) for e, id_, doc in zip(embeddings, batch_ids, batch_docs) if e]
+        if stored:
+            batch_embeddings, stored_ids, stored_docs = zip(*stored)
+            collection.add(documents=list(stored_docs), embeddings=list(batch_embeddings), ids=list(stored_ids))
+            progress["embedded"] += len(stored)
+        if len(stored) == len(batch_docs):
             tqdm.write(f"✅ Stored batch {i}–{i + len(batch_docs) - 1}")
         else:
-            tqdm.write(f"⚠️ Skipped batch {i} due to embedding mismatch or error.")
+            complete = False
+            failed_ids = [id_ for e, id_ in zip(embeddings, batch_ids) if not e]
+            tqdm.write(f"⚠️ Batch {i}: {len(failed_ids)} rows failed to embed: {', '.join(failed_ids[:5])}")
+
+    # Only a complete pass is recorded, so skipped batches are retried next start
+    if complete:
+        _save_manifest_entry(name, {"sha256": content_hash, "count": collection.count(), "rows": len(store)})
 
     print(f"🎉 Done embedding and storing dataset '{name}'")
 
+# -----------------------------
+# In-process Vector Index (VECTOR_BACKEND=numpy)
+# -----------------------------
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+vector_indexes = {}
+
+
+def export_embeddings(collection, page_size: int = 5000):
+    """All (ids, embeddings) of a collection, paged so large datasets stay bounded."""
+    ids, embeddings = [], []
+    total = collection.count()
+    for offset in range(0, total, page_size):
+        page = collection.get(include=["embeddings"], limit=page_size, offset=offset)
+        ids.extend(page["ids"])
+        embeddings.extend(page["embeddings"])
+    return ids, embeddings
+
+
+def load_vector_index(name):
+    """Memory-map the dataset's vectors, rebuilding them from Chroma when the data changed."""
+    collection = chroma_client.get_collection(name=name, embedding_function=embedding_fn)
+    indexed = load_manifest().get(name, {})
+    stamp = f"{indexed.get('sha256', 'partial')}:{collection.count()}"
+
+    index = VectorIndex.load(name, stamp)
+    if index is None:
+        print(f"🧮 Building in-process vector index for '{name}'...")
+        ids, embeddings = export_embeddings(collection)
+        index = VectorIndex.build(name, ids, embeddings, stamp)
+    vector_indexes[name] = index
+    return index
+
+# -----------------------------
+# Gazetteer Pre-filtering
+# -----------------------------
+# Place names in a prompt become an exact row filter ahead of vector search
+GAZETTEER_MAX_CANDIDATES = int(os.getenv("GAZETTEER_MAX_CANDIDATES", "2000"))
+gazetteers = {}
+
+
+def load_gazetteer(name):
+    fields = datasets[name].get("gazetteer")
+    if not fields:
+        return None
+    gazetteers[name] = Gazetteer.build(row_stores[name], fields)
+    print(f"🗺️ Gazetteer for '{name}': {len(gazetteers[name])} place names")
+    return gazetteers[name]
+
+# -----------------------------
+# Lexical (BM25) Index
+# -----------------------------
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "1") == "1"
+HYBRID_DEPTH = 4  # each ranking contributes top_k * HYBRID_DEPTH ids to the fusion
+lexical_indexes = {}
+# Own pool: queries already run on the stage pool and must not wait on a slot in it
+_vector_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("VECTOR_SEARCH_WORKERS", "8")), thread_name_prefix="vector-search"
+)
+
+
+def load_lexical_index(name):
+    """Bring the dataset's BM25 index in line with its row store, touching only changed rows."""
+    store = row_stores[name]
+    formatter = datasets[name]["format_row"]
+    index = BM25Index.load(name) or BM25Index()
+
+    to_add, to_delete = diff_row_keys(store.ids, list(index.slots))
+    for id_ in to_delete:
+        index.remove(id_)
+    for id_ in to_add:
+        index.add(id_, formatter(store.record(store.positions[id_])))
+    if to_add or to_delete:
+        print(f"🔤 Lexical index '{name}': +{len(to_add)} / -{len(to_delete)} documents")
+        index.save(name)
+
+    lexical_indexes[name] = index
+    return index
+
+# -----------------------------
+# Lazy / Background Indexing
+# -----------------------------
+class DatasetNotReady(Exception):
+    """The dataset is still being indexed; the caller should ask the user to try again shortly."""
+
+
+_index_threads = {}
+_index_threads_lock = threading.Lock()
+
+
+def ensure_collection(name, wait: bool = True):
+    """Make sure a dataset is indexed and loaded; blocks only callers of this dataset.
+
+    With wait=False a dataset that is not ready yet is indexed on a
+    background thread and DatasetNotReady is raised instead of blocking.
+    """
+    progress = indexing_progress[name]
+    if progress["state"] == "ready":
+        return
+    if not wait:
+        index_in_background(name)
+        raise DatasetNotReady(name)
+
+    with _dataset_locks[name]:
+        if progress["state"] == "ready":
+            return
+        config = datasets[name]
+        started = time.perf_counter()
+        try:
+            with _IndexFileLock(INDEX_LOCK_PATH.format(name=name)):
+                populate_embeddings(name, config["path"], config["format_row"])
+                if VECTOR_BACKEND == "numpy":
+                    load_vector_index(name)
+            load_gazetteer(name)
+            if HYBRID_SEARCH:
+                load_lexical_index(name)
+            progress["state"] = "ready"
+            progress["error"] = None
+        except Exception as e:
+            progress["state"] = "failed"
+            progress["error"] = str(e)
+            print(f"[Indexing Error] {name}: {e}")
+            raise
+        finally:
+            progress["seconds"] = round(time.perf_counter() - started, 2)
+
+
+def _index_quietly(name):
+    try:
+        ensure_collection(name)
+    except Exception:
+        pass  # Recorded in indexing_progress; retried on the next query
+
+
+def _index_all_in_background():
+    for name in datasets:
+        _index_quietly(name)
+
+
+def index_in_background(name):
+    """Index one dataset on a daemon thread unless one is already doing so."""
+    with _index_threads_lock:
+        thread = _index_threads.get(name)
+        if thread is None or not thread.is_alive():
+            thread = threading.Thread(target=_index_quietly, args=(name,), name=f"dataset-indexer-{name}", daemon=True)
+            _index_threads[name] = thread
+            thread.start()
+        return thread
+
+
+def start_background_indexing():
+    thread = threading.Thread(target=_index_all_in_background, name="dataset-indexer", daemon=True)
+    thread.start()
+    return thread
+
+
+def indexing_status() -> dict:
+    status = {name: dict(progress) for name, progress in indexing_progress.items()}
+    for name, index in vector_indexes.items():
+        status[name]["vector_index"] = {
+            "rows": len(index),
+            "quantized": index.codes is not None,
+            "scan_bytes": index.resident_bytes(),
+        }
+    for name, index in lexical_indexes.items():
+        status[name]["lexical_documents"] = len(index)
+    return status
+
 # -----------------------------
 # Initialize All Datasets
 # -----------------------------
 def init_all_collections():
-    for name, config in datasets.items():
-        populate_embeddings(name, config["path"], config["format_row"])
+    for name in datasets:
+        ensure_collection(name)
 
 # -----------------------------
 # Query Functions
 # -----------------------------
-def chroma_query(dataset_name: str, prompt: str, top_k: int = 5):
+def _vector_search(dataset_name: str, prompt: str, top_k: int, candidate_ids: List[str] = None) -> List[str]:
+    # Precomputed (cached) query vector; Chroma embeds the text itself only if that failed
+    query_embedding = embed_query(prompt)
+
+    if candidate_ids is not None:
+        if query_embedding is None:
+            return candidate_ids[:top_k]
+        if VECTOR_BACKEND == "numpy":
+            index = vector_indexes[dataset_name]
+            hits = index.search(query_embedding, top_k, rows=index.rows_for(candidate_ids))[0]
+        else:
+            collection = chroma_client.get_collection(name=dataset_name, embedding_function=embedding_fn)
+            page = collection.get(ids=candidate_ids, include=["embeddings"])
+            if not page["ids"]:
+                return candidate_ids[:top_k]
+            subset = VectorIndex(page["ids"], VectorIndex.normalize(page["embeddings"]))
+            hits = subset.search(query_embedding, top_k)[0]
+        return [id_ for id_, _ in hits]
+
+    if VECTOR_BACKEND == "numpy" and query_embedding is not None:
+        hits = vector_indexes[dataset_name].search(query_embedding, top_k)[0]
+        return [id_ for id_, _ in hits]
+
     collection = chroma_client.get_collection(name=dataset_name, embedding_function=embedding_fn)
-    results = collection.query(query_texts=[prompt], n_results=top_k)
-    indices = [int(id) for id in results["ids"][0]]
-    return dataframes[dataset_name].iloc[indices].to_dict(orient="records")
+    if query_embedding is not None:
+        results = collection.query(query_embeddings=[query_embedding], n_results=top_k)
+    else:
+        results = collection.query(query_texts=[prompt], n_results=top_k)
+    return results["ids"][0]
+
+
+def _narrow_candidates(dataset_name: str, place) -> List[str]:
+    """Ids within the matched place, cut down to GAZETTEER_MAX_CANDIDATES before any embedding math."""
+    store = row_stores[dataset_name]
+    positions = place.positions
+    if len(positions) > GAZETTEER_MAX_CANDIDATES:
+        # "government schools in belgaum": prefer rows that matched the most specific level
+        positions = place.most_specific()
+    if len(positions) <= GAZETTEER_MAX_CANDIDATES:
+        return [store.ids[position] for position in positions]
+
+    # Still too many: keep the rows that mention the rest of the prompt, best BM25 first
+    lexical = lexical_indexes.get(dataset_name) if HYBRID_SEARCH else None
+    if lexical is not None:
+        allowed = {store.ids[position] for position in positions}
+        hits = lexical.search(" ".join(place.residual), GAZETTEER_MAX_CANDIDATES, allowed)
+        if hits:
+            return [id_ for id_, _, _ in hits]
+    return [store.ids[position] for position in place.ranked(GAZETTEER_MAX_CANDIDATES)]
+
+
+def chroma_query(dataset_name: str, prompt: str, top_k: int = 5):
+    # A dataset still being embedded can take minutes; answer "try again" rather than hang the call
+    ensure_collection(dataset_name, wait=False)
+    store = row_stores[dataset_name]
+    columns = datasets[dataset_name].get("columns")
+
+    candidate_ids = None
+    place = gazetteers[dataset_name].match(prompt) if dataset_name in gazetteers else None
+    if place is not None:
+        print(f"[GAZETTEER] {dataset_name}: {place.describe()} -> {len(place.positions)} rows")
+        # "schools in hoskote": the place alone answers it, no embedding needed;
+        # village matches come before block and district ones
+        if not place.residual or len(place.positions) <= top_k:
+            return store.records(place.ranked(top_k), columns)
+        candidate_ids = _narrow_candidates(dataset_name, place)
+
+    lexical = lexical_indexes.get(dataset_name) if HYBRID_SEARCH else None
+    if lexical is None:
+        result_ids = _vector_search(dataset_name, prompt, top_k, candidate_ids)
+    else:
+        depth = top_k * HYBRID_DEPTH
+        allowed = set(candidate_ids) if candidate_ids is not None else None
+        # The vector leg (query embedding + scan) runs while BM25 scores on this thread
+        vector_future = _vector_executor.submit(_vector_search, dataset_name, prompt, depth, candidate_ids)
+        lexical_hits = lexical.search(prompt, depth, allowed)
+
+        exact = [id_ for id_, _, covers_all in lexical_hits if covers_all]
+        if exact and lexical.count_covering(prompt, allowed) <= top_k:
+            # Every keyword matched in only a handful of documents ("pragati scholarship"):
+            # answer lexically without waiting for the vector leg
+            vector_future.cancel()
+            print(f"[LEXICAL] {dataset_name}: exact keyword match, {len(exact)} rows")
+            result_ids = exact[:top_k]
+        else:
+            vector_ids = vector_future.result()
+            result_ids = reciprocal_rank_fusion([vector_ids, [id_ for id_, _, _ in lexical_hits]], top_k)
+
+    positions = row_positions[dataset_name]
+    indices = [positions[id_] for id_ in result_ids if id_ in positions]
+    return store.records(indices, columns)
 
 chroma_karnataka_schools = lambda prompt, top_k=5: chroma_query("karnataka_schools", prompt, top_k)
 chroma_indian_scholarships = lambda prompt, top_k=5: chroma_query("indian_scholarships", prompt, top_k)
@@ -0,0 +1,224 @@
+import os
+import re
+import difflib
+import numpy as np
+from collections import defaultdict
+from typing import Dict, List
+
+# -----------------------------
+# Gazetteer Configuration
+# -----------------------------
+GAZETTEER_FUZZY_CUTOFF = float(os.getenv("GAZETTEER_FUZZY_CUTOFF", "0.88"))
+GAZETTEER_MAX_WORDS = 3  # longest place name matched as one phrase
+GAZETTEER_MIN_CHARS = 4  # single words shorter than this only match right after a place cue
+GAZETTEER_FUZZY_MIN_CHARS = 5
+
+PINCODE = re.compile(r"\b[1-9]\d{5}\b")
+CODE_PREFIX = re.compile(r"^\s*\d+\s*-\s*")
+
+# Words that carry no meaning once the place is known
+FILLER_WORDS = {
+    "a", "an", "the", "of", "in", "at", "to", "for", "and", "with", "from", "near", "nearby", "around",
+    "find", "show", "list", "give", "tell", "me", "my", "i", "want", "need", "please", "about",
+    "which", "what", "are", "is", "there", "any", "some", "all",
+    "school", "schools", "area", "locality", "located", "location",
+    "village", "block", "district", "taluk", "pincode", "pin", "code",
+}
+# Words that are never place names but still matter to the semantic search
+SCHOOL_WORDS = {
+    "government", "private", "aided", "unaided", "public", "model", "residential",
+    "primary", "upper", "lower", "high", "higher", "secondary", "college",
+    "english", "kannada", "urdu", "hindi", "medium", "girls", "boys", "good", "best", "top",
+}
+
+# A place name is expected right after these ("near hoskote") or right before
+# the level words ("hoskote taluk"); only then are misspellings matched fuzzily
+PLACE_CUES = {"in", "near", "at", "around", "nearby"}
+LEVEL_WORDS = {"village", "block", "district", "taluk", "pincode"}
+
+# Most specific first: used to rank rows when the place alone answers a query
+SPECIFICITY = {"village": 0, "pincode": 1, "block": 2, "district": 3}
+MATCH_QUALITY = {"exact": 0, "skeleton": 1, "fuzzy": 2}
+
+# Common spelling variants of transliterated Kannada place names
+_TRANSLITERATION = [
+    ("aa", "a"), ("ee", "i"), ("ii", "i"), ("oo", "u"), ("uu", "u"), ("ou", "u"),
+    ("bh", "b"), ("dh", "d"), ("gh", "g"), ("kh", "k"), ("ph", "f"), ("th", "t"), ("sh", "s"),
+    ("ck", "k"), ("q", "k"), ("w", "v"), ("z", "j"), ("y", "i"),
+]
+
+
+def normalize_place(value: str) -> str:
+    """'2901 - BELGAUM' -> 'belgaum'; punctuation becomes whitespace."""
+    value = CODE_PREFIX.sub("", str(value)).lower()
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", value).split())
+
+
+def skeleton(name: str) -> str:
+    """Spelling-insensitive key: 'Hosakote', 'Hosakotte' and 'Hosaakote' agree."""
+    key = name.replace(" ", "")
+    for variant, canonical in _TRANSLITERATION:
+        key = key.replace(variant, canonical)
+    return re.sub(r"(.)\1+", r"\1", key)
+
+
+class PlaceMatch:
+    """Places found in a prompt and the rows that lie in all of them."""
+
+    def __init__(self, gazetteer: "Gazetteer", places: List[tuple], positions: np.ndarray, residual: List[str]):
+        self.gazetteer = gazetteer
+        self.places = places        # [(phrase, [(field, name, quality), ...]), ...]
+        self.positions = positions  # sorted row positions
+        self.residual = residual    # prompt words left for the semantic search
+
+    def describe(self) -> str:
+        return "; ".join(
+            f"{phrase} = {', '.join(f'{field}:{name}' + ('~' if quality != 'exact' else '') for field, name, quality in names)}"
+            for phrase, names in self.places
+        )
+
+    def _levels(self):
+        """Matched (field, name) pairs, most specific and most certain first."""
+        matched = {
+            (field, name): (SPECIFICITY.get(field, len(SPECIFICITY)), MATCH_QUALITY[quality])
+            for _, names in self.places
+            for field, name, quality in names
+        }
+        return sorted(matched, key=matched.get)
+
+    def ranked(self, limit: int = None) -> List[int]:
+        """Row positions ordered by how specifically they matched: village hits before block before district."""
+        ranked, seen = [], set()
+        for field, name in self._levels():
+            rows = np.intersect1d(self.gazetteer.rows[field][name], self.positions, assume_unique=True)
+            for position in rows.tolist():
+                if position not in seen:
+                    seen.add(position)
+                    ranked.append(position)
+                    if limit is not None and len(ranked) >= limit:
+                        return ranked
+        return ranked
+
+    def most_specific(self) -> np.ndarray:
+        """Rows of the most specific level that matched, within the current positions."""
+        levels = self._levels()
+        best = SPECIFICITY.get(levels[0][0], len(SPECIFICITY))
+        rows = [
+            self.gazetteer.rows[field][name] for field, name in levels
+            if SPECIFICITY.get(field, len(SPECIFICITY)) == best
+        ]
+        narrowed = np.intersect1d(np.unique(np.concatenate(rows)), self.positions, assume_unique=True)
+        return narrowed if len(narrowed) else self.positions
+
+
+# -----------------------------
+# Place-name index over a row store
+# -----------------------------
+class Gazetteer:
+    """Place name -> row positions for each configured column, with fuzzy lookup."""
+
+    def __init__(self, fields: List[str]):
+        self.fields = fields
+        self.rows: Dict[str, Dict[str, np.ndarray]] = {field: {} for field in fields}
+        self.skeletons: Dict[str, Dict[str, List[str]]] = {field: defaultdict(list) for field in fields}
+        # (first letter, length) buckets keep fuzzy matching to a few hundred names
+        self.buckets: Dict[str, Dict[tuple, List[str]]] = {field: defaultdict(list) for field in fields}
+
+    @classmethod
+    def build(cls, store, fields: List[str]) -> "Gazetteer":
+        fields = [field for field in fields if field in store.columns]
+        gazetteer = cls(fields)
+        for field in fields:
+            positions = defaultdict(list)
+            for position in range(len(store)):
+                name = normalize_place(store.value(position, field))
+                if name:
+                    positions[name].append(position)
+            gazetteer.rows[field] = {name: np.asarray(rows, dtype=np.int32) for name, rows in positions.items()}
+            for name in positions:
+                key = skeleton(name)
+                if name not in gazetteer.skeletons[field][key]:
+                    gazetteer.skeletons[field][key].append(name)
+                    if key and len(gazetteer.skeletons[field][key]) == 1:
+                        gazetteer.buckets[field][(key[0], len(key))].append(key)
+        return gazetteer
+
+    def __len__(self):
+        return sum(len(names) for names in self.rows.values())
+
+    def lookup(self, phrase: str, fuzzy: bool = True) -> List[tuple]:
+        """[(field, name, quality)] for every column where `phrase` names a place."""
+        found = []
+        key = skeleton(phrase)
+        for field in self.fields:
+            if phrase in self.rows[field]:
+                found.append((field, phrase, "exact"))
+            elif key in self.skeletons[field]:
+                found.extend((field, name, "skeleton") for name in self.skeletons[field][key])
+            elif fuzzy and len(key) >= GAZETTEER_FUZZY_MIN_CHARS:
+                candidates = [
+                    candidate
+                    for length in range(len(key) - 2, len(key) + 3)
+                    for candidate in self.buckets[field].get((key[0], length), ())
+                ]
+                for close in difflib.get_close_matches(key, candidates, n=1, cutoff=GAZETTEER_FUZZY_CUTOFF):
+                    found.extend((field, name, "fuzzy") for name in self.skeletons[field][close])
+        return found
+
+    def match(self, prompt: str) -> PlaceMatch | None:
+        """Place names in the prompt; None when there are none."""
+        tokens = normalize_place(prompt).split()
+        consumed = set()
+        places = []
+
+        # Pincodes are exact; everything else is tried longest phrase first
+        has_pincode = False
+        if "pincode" in self.rows:
+            for i, token in enumerate(tokens):
+                if PINCODE.fullmatch(token) and token in self.rows["pincode"]:
+                    places.append((token, [("pincode", token, "exact")]))
+                    consumed.add(i)
+                    has_pincode = True
+
+        for size in range(GAZETTEER_MAX_WORDS, 0, -1):
+            for i in range(len(tokens) - size + 1):
+                span = range(i, i + size)
+                if any(j in consumed for j in span):
+                    continue
+                words = tokens[i:i + size]
+                if any(word in FILLER_WORDS for word in words):
+                    continue
+                cued = (
+                    has_pincode
+                    or (i > 0 and tokens[i - 1] in PLACE_CUES)
+                    or (i + size < len(tokens) and tokens[i + size] in LEVEL_WORDS)
+                )
+                if size == 1 and (words[0] in SCHOOL_WORDS or words[0].isdigit()):
+                    continue
+                if size == 1 and len(words[0]) < (3 if cued else GAZETTEER_MIN_CHARS):
+                    continue
+                phrase = " ".join(words)
+                # Without a cue an ordinary word must spell a place exactly (or by skeleton)
+                names = self.lookup(phrase, fuzzy=cued)
+                if names:
+                    places.append((phrase, names))
+                    consumed.update(span)
+
+        if not places:
+            return None
+
+        # A phrase may name a village, a block and a district at once: any of them.
+        # Separate phrases narrow each other ("hosur, belgaum district").
+        per_phrase = [
+            np.unique(np.concatenate([self.rows[field][name] for field, name, _ in names]))
+            for _, names in places
+        ]
+        positions = per_phrase[0]
+        for rows in per_phrase[1:]:
+            narrowed = np.intersect1d(positions, rows, assume_unique=True)
+            positions = narrowed if len(narrowed) else positions
+        if not len(positions):
+            return None
+
+        residual = [token for i, token in enumerate(tokens) if i not in consumed and token not in FILLER_WORDS]
+        return PlaceMatch(self, places, positions, residual)
@@ -0,0 +1,231 @@
+import os
+import re
+import math
+import heapq
+import numpy as np
+from array import array
+from collections import Counter
+from typing import Dict, List
+from helpers.mmap_files import ArrayFiles
+
+# -----------------------------
+# Lexical Index Configuration
+# -----------------------------
+LEXICAL_INDEX_DIR = os.getenv("LEXICAL_INDEX_DIR", os.path.join(".chroma", "lexical"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+LEXICAL_COMPACT_RATIO = 0.25  # rebuild postings once this share of documents is deleted
+
+TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "and", "or", "with", "from", "by",
+    "is", "are", "was", "be", "what", "which", "who", "how", "me", "my", "i", "about", "tell",
+    "give", "show", "find", "list", "any", "some", "please", "q", "s",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN.findall(str(text).lower()) if token not in STOPWORDS]
+
+
+_files = ArrayFiles(LEXICAL_INDEX_DIR, {"docs": "docs.npy", "tfs": "tfs.npy"})
+
+
+# -----------------------------
+# BM25 inverted index
+# -----------------------------
+class BM25Index:
+    """Term -> (doc slots, term frequencies) as packed arrays.
+
+    Documents are added in place and removed by tombstone; postings are
+    compacted once enough of them point at deleted documents. Queries score
+    with numpy over per-term arrays of live postings, built on first use and
+    dropped whenever the index changes.
+    """
+
+    def __init__(self):
+        self.ids: List[str] = []           # slot -> document id (None once deleted)
+        self.lengths = array("I")          # slot -> token count
+        self.postings: Dict[str, tuple] = {}
+        self.slots: Dict[str, int] = {}    # document id -> slot
+        self.deleted = 0
+        self.total_length = 0
+        self._changed()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _changed(self):
+        self._live_postings = {}
+        self._alive = None
+        self._lengths = None
+
+    def add(self, id_: str, text: str):
+        if id_ in self.slots:
+            self.remove(id_)
+        slot = len(self.ids)
+        tokens = tokenize(text)
+        self.ids.append(id_)
+        self.lengths.append(len(tokens))
+        self.slots[id_] = slot
+        self.total_length += len(tokens)
+        for term, tf in Counter(tokens).items():
+            docs, tfs = self.postings.setdefault(term, (array("I"), array("H")))
+            docs.append(slot)
+            tfs.append(min(tf, 65535))
+        self._changed()
+
+    def remove(self, id_: str):
+        slot = self.slots.pop(id_, None)
+        if slot is None:
+            return
+        self.ids[slot] = None
+        self.total_length -= self.lengths[slot]
+        self.deleted += 1
+        self._changed()
+        if self.deleted > LEXICAL_COMPACT_RATIO * len(self.ids):
+            self.compact()
+
+    def compact(self):
+        """Drop deleted slots and renumber the rest."""
+        remap = {}
+        ids, lengths = [], array("I")
+        for slot, id_ in enumerate(self.ids):
+            if id_ is not None:
+                remap[slot] = len(ids)
+                ids.append(id_)
+                lengths.append(self.lengths[slot])
+
+        postings = {}
+        for term, (docs, tfs) in self.postings.items():
+            kept = [(remap[d], tf) for d, tf in zip(docs, tfs) if d in remap]
+            if kept:
+                postings[term] = (array("I", (d for d, _ in kept)), array("H", (tf for _, tf in kept)))
+
+        self.ids, self.lengths, self.postings = ids, lengths, postings
+        self.slots = {id_: slot for slot, id_ in enumerate(ids)}
+        self.deleted = 0
+        self._changed()
+
+    def _live(self, term: str):
+        """(slots, tfs) of the live documents containing `term`."""
+        found = self._live_postings.get(term)
+        if found is None:
+            if self._alive is None:
+                self._alive = np.array([id_ is not None for id_ in self.ids], dtype=bool)
+            docs, tfs = self.postings.get(term, ((), ()))
+            docs = np.array(docs, dtype=np.int64)
+            tfs = np.array(tfs, dtype=np.float32)
+            keep = self._alive[docs]
+            found = self._live_postings[term] = (docs[keep], tfs[keep])
+        return found
+
+    def _allowed_mask(self, allowed: set) -> np.ndarray:
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[[self.slots[id_] for id_ in allowed if id_ in self.slots]] = True
+        return mask
+
+    def search(self, query: str, top_k: int = 5, allowed: set = None) -> List[tuple]:
+        """Top-k (id, score, covers_all_terms), best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        live = len(self.slots)
+        if not terms or not live:
+            return []
+
+        if self._lengths is None:
+            self._lengths = np.array(self.lengths, dtype=np.float32)
+        norms = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths / (self.total_length / live))
+        mask = self._allowed_mask(allowed) if allowed is not None else None
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        matched = np.zeros(len(self.ids), dtype=np.int32)
+        for term in terms:
+            docs, tfs = self._live(term)
+            if not len(docs):
+                continue
+            # Document frequency over live documents only, so the IDF stays positive
+            idf = math.log(1 + (live - len(docs) + 0.5) / (len(docs) + 0.5))
+            if mask is not None:
+                within = mask[docs]
+                docs, tfs = docs[within], tfs[within]
+            scores[docs] += idf * tfs * (BM25_K1 + 1) / (tfs + norms[docs])
+            matched[docs] += 1
+
+        candidates = np.flatnonzero(matched)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        best = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self.ids[slot], float(scores[slot]), bool(matched[slot] == len(terms))) for slot in best]
+
+    def count_covering(self, query: str, allowed: set = None) -> int:
+        """Live documents (within `allowed`, when given) that contain every query term."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return 0
+        mask = self._allowed_mask(allowed) if allowed is not None else None
+        common = None
+        for term in sorted(terms, key=lambda t: len(self._live(t)[0])):
+            docs = self._live(term)[0]
+            if mask is not None:
+                docs = docs[mask[docs]]
+            common = docs if common is None else np.intersect1d(common, docs, assume_unique=True)
+            if not len(common):
+                return 0
+        return len(common)
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def save(self, name: str):
+        """Write compacted postings as two flat arrays plus per-term offsets."""
+        if self.deleted:
+            self.compact()
+        terms = sorted(self.postings)
+        offsets = [0]
+        docs, tfs = array("I"), array("H")
+        for term in terms:
+            term_docs, term_tfs = self.postings[term]
+            docs.extend(term_docs)
+            tfs.extend(term_tfs)
+            offsets.append(len(docs))
+
+        _files.save(
+            name,
+            {
+                "docs": np.frombuffer(docs.tobytes(), dtype=np.uint32),
+                "tfs": np.frombuffer(tfs.tobytes(), dtype=np.uint16),
+            },
+            {"ids": self.ids, "lengths": self.lengths.tolist(), "terms": terms, "offsets": offsets},
+        )
+
+    @classmethod
+    def load(cls, name: str) -> "BM25Index | None":
+        loaded = _files.load(name, mmap_mode=None)
+        if loaded is None:
+            return None
+        meta, arrays = loaded
+        docs, tfs = arrays["docs"], arrays["tfs"]
+        if len(docs) != meta["offsets"][-1] or len(tfs) != len(docs):
+            return None
+
+        index = cls()
+        index.ids = meta["ids"]
+        index.lengths = array("I", meta["lengths"])
+        index.slots = {id_: slot for slot, id_ in enumerate(index.ids)}
+        index.total_length = sum(index.lengths)
+        offsets = meta["offsets"]
+        for i, term in enumerate(meta["terms"]):
+            start, stop = offsets[i], offsets[i + 1]
+            index.postings[term] = (
+                array("I", docs[start:stop].astype(np.uint32).tobytes()),
+                array("H", tfs[start:stop].astype(np.uint16).tobytes()),
+            )
+        return index
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], top_k: int, k: int = 60) -> List[str]:
+    """Merge ranked id lists: score = sum of 1 / (k + rank) over the lists an id appears in."""
+    scores = {}
+    for ranking in rankings:
+        for rank, id_ in enumerate(ranking, start=1):
+            scores[id_] = scores.get(id_, 0.0) + 1.0 / (k + rank)
+    return [id_ for id_, _ in heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])]
@@ -2,9 +2,9 @@ import re
 import json
 import ollama
 import numpy as np
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from tqdm import tqdm
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 
 # ---------- LLM: Generate and sanitize response ----------
@@ -47,20 +47,65 @@ def sanitize_response(raw: str) -> str:
 
 
 # ---------- Batch Embedding Helper ----------
+EMBED_BATCH_SIZE = 64   # inputs per Ollama request
+EMBED_WORKERS = 4       # requests in flight at once
+
+# One pool for the whole process instead of one per chunk
+_embed_executor = ThreadPoolExecutor(max_workers=EMBED_WORKERS, thread_name_prefix="embed")
+
+
+def _embeddings_of(response) -> list:
+    return response.get("embeddings", []) if isinstance(response, dict) else response.embeddings
+
+
 def embed_text(text: str, model: str) -> List[float]:
+    # /api/embed returns L2-normalized vectors; the legacy endpoint does not, and both
+    # kinds land in the same collection, so legacy vectors are normalized here
     try:
+        if hasattr(ollama, "embed"):
+            embeddings = _embeddings_of(ollama.embed(model=model, input=[text]))
+            return list(embeddings[0]) if embeddings and embeddings[0] else None
         response = ollama.embeddings(model=model, prompt=text)
-        return response.get("embedding", [])
+        vector = np.asarray(response.get("embedding", []), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return (vector / norm).tolist() if norm else None
     except Exception as e:
         return None
 
 
+def _embed_request(texts: List[str], model: str) -> List[Optional[List[float]]]:
+    # Batch API (ollama >= 0.3); older clients fall back to one call per text
+    if hasattr(ollama, "embed"):
+        try:
+            embeddings = _embeddings_of(ollama.embed(model=model, input=texts))
+            if len(embeddings) == len(texts):
+                return [list(e) if e else None for e in embeddings]
+        except Exception as e:
+            tqdm.write(f"⚠️ Batch embedding failed ({e}); retrying item by item.")
+    # Item by item, so a single bad input only loses its own embedding
+    return [embed_text(text, model) or None for text in texts]
+
+
+def embed_batch(
+    texts: List[str],
+    model: str = "mxbai-embed-large",
+    batch_size: int = EMBED_BATCH_SIZE,
+) -> List[Optional[List[float]]]:
+    """Embed texts in input order; failed inputs are None at their own position."""
+    if not texts:
+        return []
+    requests_ = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+    results = []
+    for batch_result in _embed_executor.map(lambda batch: _embed_request(batch, model), requests_):
+        results.extend(batch_result)
+    return results
+
+
 # ---------- Main Embedding Function ----------
 def generate_embeddings(
     texts: List[str],
     model: str = "mxbai-embed-large",
     chunk_size: int = 100,
-    max_workers: int = 6,
     collection: Any = None,
     ids: List[str] = None,
     documents: List[str] = None,
@@ -77,30 +122,17 @@ def generate_embeddings(
         batch_docs = documents[i:i + chunk_size] if documents else batch
         batches.append((i, batch, batch_ids, batch_docs))
 
-    tqdm.write(f"🔍 Starting embedding in {len(batches)} batches (chunk size = {chunk_size})")
+    show_progress = len(batches) > 1
+    if show_progress:
+        tqdm.write(f"🔍 Starting embedding in {len(batches)} batches (chunk size = {chunk_size})")
 
     all_embeddings = []
 
-    with tqdm(total=len(batches), desc="🚀 Total Progress") as overall_progress:
+    with tqdm(total=len(batches), desc="🚀 Total Progress", disable=not show_progress) as overall_progress:
         for batch_index, batch, batch_ids, batch_docs in batches:
-            batch_embeddings = []
-            successful = 0
-            failed = 0
-
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                future_to_text = {
-                    executor.submit(embed_text, text, model): (text, idx)
-                    for idx, text in enumerate(batch)
-                }
-
-                for future in as_completed(future_to_text):
-                    text, idx = future_to_text[future]
-                    embedding = future.result()
-                    batch_embeddings.append(embedding)
-                    if embedding:
-                        successful += 1
-                    else:
-                        failed += 1
+            batch_embeddings = embed_batch(batch, model=model)
+            successful = sum(1 for e in batch_embeddings if e)
+            failed = len(batch) - successful
 
             # Store in collection (if passed)
             if collection and batch_ids:
@@ -110,10 +142,12 @@ def generate_embeddings(
                     collection.add(embeddings=emb, ids=id_, documents=doc_)
 
             all_embeddings.extend([e for e in batch_embeddings if e])
-            tqdm.write(f"✅ Batch {batch_index}-{batch_index+len(batch)-1}: {successful} stored, {failed} failed.")
+            if show_progress:
+                tqdm.write(f"✅ Batch {batch_index}-{batch_index+len(batch)-1}: {successful} stored, {failed} failed.")
             overall_progress.update(1)
 
-    tqdm.write(f"\n🎉 Done! Embedded {len(all_embeddings)} total entries.\n")
+    if show_progress:
+        tqdm.write(f"\n🎉 Done! Embedded {len(all_embeddings)} total entries.\n")
     return all_embeddings
 
 # ---------- Similarity ----------
@@ -0,0 +1,57 @@
+import os
+import json
+import numpy as np
+from typing import Dict, Iterable
+
+# -----------------------------
+# Array files committed by their metadata
+# -----------------------------
+class ArrayFiles:
+    """A named set of .npy arrays plus a JSON metadata file, in one directory.
+
+    Every array is written to a temporary file and renamed into place, and
+    the metadata is written last: a reader that finds metadata (with the
+    expected stamp) knows the arrays next to it are complete.
+    """
+
+    def __init__(self, directory: str, suffixes: Dict[str, str]):
+        self.directory = directory
+        self.suffixes = suffixes  # array key -> file suffix, e.g. {"matrix": "f32.npy"}
+
+    def paths(self, name: str) -> Dict[str, str]:
+        base = os.path.join(self.directory, name)
+        paths = {key: f"{base}.{suffix}" for key, suffix in self.suffixes.items()}
+        paths["meta"] = f"{base}.json"
+        return paths
+
+    def save(self, name: str, arrays: Dict[str, np.ndarray], meta: dict):
+        paths = self.paths(name)
+        os.makedirs(self.directory, exist_ok=True)
+        for key, array in arrays.items():
+            save_array(paths[key], array)
+
+        # Metadata last: it is what marks the arrays as complete
+        tmp_meta = f"{paths['meta']}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, paths["meta"])
+
+    def load(self, name: str, keys: Iterable[str] = None, stamp: str = None, mmap_mode: str = "r"):
+        """(meta, {key: array}); None if missing, unreadable or saved under another stamp."""
+        paths = self.paths(name)
+        try:
+            with open(paths["meta"], encoding="utf-8") as f:
+                meta = json.load(f)
+            if stamp is not None and meta.get("stamp") != stamp:
+                return None
+            # Mapped pages are shared between worker processes through the OS page cache
+            arrays = {key: np.load(paths[key], mmap_mode=mmap_mode) for key in (keys or self.suffixes)}
+        except (OSError, ValueError, json.JSONDecodeError):
+            return None
+        return meta, arrays
+
+
+def save_array(path: str, array: np.ndarray):
+    tmp_path = f"{path}.tmp.npy"
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
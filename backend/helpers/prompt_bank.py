@@ -0,0 +1,60 @@
+import os
+import json
+import threading
+from helpers.tts_cache import cache_key
+
+# -----------------------------
+# Pre-rendered Prompt Bank
+# -----------------------------
+# Built at deploy time by helpers/audio_samples_generator.py; looked up
+# before any live synthesis so constant prompts never reach the TTS service.
+PROMPT_BANK_DIR = os.getenv("PROMPT_BANK_DIR", "static/audio/prompts")
+MANIFEST_NAME = "manifest.json"
+
+_entries = None
+_audio = {}
+_lock = threading.Lock()
+
+
+def prompt_file_name(text: str, voice: str, rate: str) -> str:
+    return f"{cache_key(text, voice, rate)}.mp3"
+
+
+def _load_entries() -> dict:
+    global _entries
+    with _lock:
+        if _entries is not None:
+            return _entries
+
+        _entries = {}
+        path = os.path.join(PROMPT_BANK_DIR, MANIFEST_NAME)
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"[Prompt Bank] No manifest at {path}, prompts will be synthesized live.")
+            return _entries
+
+        for entry in manifest.get("prompts", []):
+            key = (entry["text"], entry["voice"], manifest.get("rate"))
+            _entries[key] = os.path.join(PROMPT_BANK_DIR, entry["file"])
+
+        print(f"[Prompt Bank] Loaded {len(_entries)} pre-rendered prompts.")
+        return _entries
+
+
+def get_prompt_audio(text: str, voice: str, rate: str) -> bytes | None:
+    path = _load_entries().get((text, voice, rate))
+    if not path:
+        return None
+
+    audio = _audio.get(path)
+    if audio is None:
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except OSError as e:
+            print(f"[Prompt Bank Error] {e}")
+            return None
+        _audio[path] = audio
+    return audio
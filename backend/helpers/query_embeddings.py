@@ -0,0 +1,77 @@
+import os
+import threading
+import numpy as np
+from typing import List, Optional
+from helpers.llm import embed_batch
+from helpers.sqlite_cache import TieredCache
+
+# -----------------------------
+# Query Embedding Cache Configuration
+# -----------------------------
+QUERY_EMBED_MODEL = os.getenv("QUERY_EMBED_MODEL", "mxbai-embed-large")
+QUERY_EMBED_MEMORY_ITEMS = int(os.getenv("QUERY_EMBED_MEMORY_ITEMS", "2048"))
+# Empty disables the persistent tier
+QUERY_EMBED_CACHE_PATH = os.getenv("QUERY_EMBED_CACHE_PATH", ".query_embeddings.sqlite3")
+# The persistent tier is keyed by raw caller prompts, so it is bounded in age and size
+QUERY_EMBED_CACHE_TTL = int(os.getenv("QUERY_EMBED_CACHE_TTL", str(30 * 24 * 3600)))  # seconds
+QUERY_EMBED_CACHE_MAX_ROWS = int(os.getenv("QUERY_EMBED_CACHE_MAX_ROWS", "20000"))
+
+# -----------------------------
+# Cache: in-memory LRU over an optional SQLite table
+# -----------------------------
+_cache = TieredCache(
+    QUERY_EMBED_CACHE_PATH,
+    "query_embedding_cache",
+    ("model", "text"),
+    "embedding",
+    memory_items=QUERY_EMBED_MEMORY_ITEMS,
+    ttl=QUERY_EMBED_CACHE_TTL,
+    max_rows=QUERY_EMBED_CACHE_MAX_ROWS,
+    value_type="BLOB",
+    encode=lambda embedding: np.asarray(embedding, dtype=np.float32).tobytes(),
+    decode=lambda blob: np.frombuffer(blob, dtype=np.float32).tolist(),
+    # The old table had no creation time to expire rows by
+    replaces="query_embeddings",
+    label="Query Embedding Cache",
+)
+_lock = threading.Lock()
+_errors = 0
+
+
+def normalize_query(text: str) -> str:
+    """Case and whitespace differences should not cost an Ollama round trip."""
+    return " ".join(text.lower().split())
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def embed_query(text: str, model: str = QUERY_EMBED_MODEL) -> Optional[List[float]]:
+    """Embedding for a search query, cached by (model, normalized text); None if Ollama fails."""
+    global _errors
+    key = (model, normalize_query(text))
+    embedding = _cache.get(key)
+    if embedding is not None:
+        return embedding
+
+    embedding = embed_batch([key[1]], model=model)[0]
+    if embedding is None:
+        with _lock:
+            _errors += 1
+        return None
+    _cache.put(key, embedding)
+    return embedding
+
+
+def query_embedding_stats() -> dict:
+    cache = _cache.stats()
+    hits = cache["memory_hits"] + cache["disk_hits"]
+    lookups = hits + cache["misses"]
+    with _lock:
+        errors = _errors
+    return {
+        **cache,
+        "errors": errors,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "model": QUERY_EMBED_MODEL,
+    }
@@ -0,0 +1,83 @@
+import os
+import numpy as np
+from typing import Dict, List
+from helpers.mmap_files import ArrayFiles
+
+# -----------------------------
+# Row Store Configuration
+# -----------------------------
+ROW_STORE_DIR = os.getenv("ROW_STORE_DIR", os.path.join(".chroma", "rows"))
+
+
+_files = ArrayFiles(ROW_STORE_DIR, {"data": "data.npy", "offsets": "offsets.npy"})
+
+
+# -----------------------------
+# Column-oriented, memory-mapped rows
+# -----------------------------
+class RowStore:
+    """Read-only string table: one UTF-8 blob, laid out column after column.
+
+    offsets[c, i]:offsets[c, i + 1] is the value of column c in row i, so a
+    lookup reads only the bytes of the rows and columns it asks for.
+    """
+
+    def __init__(self, ids: List[str], columns: List[str], data: np.ndarray, offsets: np.ndarray, stamp: str = ""):
+        self.ids = ids
+        self.columns = columns
+        self.data = data
+        self.offsets = offsets
+        self.stamp = stamp
+        self.positions = {id_: position for position, id_ in enumerate(ids)}
+        self._column_index = {column: c for c, column in enumerate(columns)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, name: str, ids: List[str], columns: List[str], rows, stamp: str) -> "RowStore":
+        """Write rows (iterables of strings, in `columns` order) and return the mapped store."""
+        rows = list(rows)
+        blob = bytearray()
+        offsets = np.zeros((len(columns), len(rows) + 1), dtype=np.int64)
+        for c in range(len(columns)):
+            offsets[c, 0] = len(blob)
+            for i, row in enumerate(rows):
+                blob += row[c].encode("utf-8")
+                offsets[c, i + 1] = len(blob)
+
+        _files.save(
+            name,
+            {"data": np.frombuffer(bytes(blob), dtype=np.uint8), "offsets": offsets},
+            {"stamp": stamp, "columns": list(columns), "ids": list(ids)},
+        )
+        return cls.load(name, stamp)
+
+    @classmethod
+    def load(cls, name: str, stamp: str = None) -> "RowStore | None":
+        """Open a saved store read-only; None if missing or built from another file version."""
+        loaded = _files.load(name, stamp=stamp)
+        if loaded is None:
+            return None
+        meta, arrays = loaded
+        data, offsets = arrays["data"], arrays["offsets"]
+        if offsets.shape != (len(meta["columns"]), len(meta["ids"]) + 1):
+            return None
+        return cls(meta["ids"], meta["columns"], data, offsets, meta.get("stamp", ""))
+
+    def value(self, position: int, column: str) -> str:
+        c = self._column_index[column]
+        start, stop = self.offsets[c, position], self.offsets[c, position + 1]
+        return bytes(self.data[start:stop]).decode("utf-8")
+
+    def record(self, position: int, columns: List[str] = None) -> Dict[str, str]:
+        return {column: self.value(position, column) for column in (columns or self.columns)}
+
+    def records(self, positions: List[int], columns: List[str] = None) -> List[Dict[str, str]]:
+        """Rows at `positions`, keeping only `columns` (all when None)."""
+        columns = [column for column in (columns or self.columns) if column in self._column_index]
+        return [self.record(position, columns) for position in positions]
+
+    def get(self, id_: str, columns: List[str] = None) -> Dict[str, str] | None:
+        position = self.positions.get(id_)
+        return None if position is None else self.record(position, columns)
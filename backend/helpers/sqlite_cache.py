@@ -0,0 +1,173 @@
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Sequence
+
+
+# -----------------------------
+# Two-tier cache: in-memory LRU over a bounded SQLite table
+# -----------------------------
+class TieredCache:
+    """An LRU dict in front of a SQLite table.
+
+    Persisted rows expire after `ttl` seconds and the table keeps at most
+    `max_rows`; both are enforced every `prune_every` writes. An empty
+    `path` keeps the cache in memory only.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        key_columns: Sequence[str],
+        value_column: str,
+        memory_items: int,
+        ttl: int,
+        max_rows: int,
+        prune_every: int = 256,
+        value_type: str = "TEXT",
+        encode: Callable = None,
+        decode: Callable = None,
+        replaces: str = None,
+        label: str = "Cache",
+    ):
+        self.path = path
+        self.table = table
+        self.key_columns = tuple(key_columns)
+        self.value_column = value_column
+        self.memory_items = memory_items
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.prune_every = prune_every
+        self.value_type = value_type
+        self.encode = encode or (lambda value: value)
+        self.decode = decode or (lambda value: value)
+        self.replaces = replaces  # older table this one supersedes; dropped on first open
+        self.label = label
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._writes_since_prune = 0
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+    @property
+    def persistent(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            if self.replaces:
+                db.execute(f"DROP TABLE IF EXISTS {self.replaces}")
+            keys = ", ".join(f"{column} TEXT" for column in self.key_columns)
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"{keys}, {self.value_column} {self.value_type}, created REAL, "
+                f"PRIMARY KEY ({', '.join(self.key_columns)}))"
+            )
+            db.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_created ON {self.table} (created)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    # -----------------------------
+    # Memory tier
+    # -----------------------------
+    def get_memory(self, key):
+        """Value from the LRU, or None; a hit is counted, a miss is not (the disk may still have it)."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+            return value
+
+    def remember(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+
+    # -----------------------------
+    # Persistent tier
+    # -----------------------------
+    def lookup_disk(self, keys: Iterable[tuple]) -> Dict[tuple, object]:
+        """Unexpired persisted values for `keys`; keys not found count as misses."""
+        keys = list(keys)
+        found = {}
+        if self.persistent and keys:
+            where = " AND ".join(f"{column}=?" for column in self.key_columns)
+            oldest = time.time() - self.ttl
+            with self._db_lock:
+                try:
+                    db = self._connect()
+                    for key in keys:
+                        row = db.execute(
+                            f"SELECT {self.value_column} FROM {self.table} WHERE {where} AND created>=?",
+                            (*key, oldest),
+                        ).fetchone()
+                        if row:
+                            found[key] = self.decode(row[0])
+                except sqlite3.Error as e:
+                    print(f"[{self.label} Error] {e}")
+        with self._lock:
+            self._stats["disk_hits"] += len(found)
+            self._stats["misses"] += len(keys) - len(found)
+        return found
+
+    def persist(self, entries: Dict[tuple, object]):
+        if not self.persistent or not entries:
+            return
+        now = time.time()
+        columns = (*self.key_columns, self.value_column, "created")
+        with self._db_lock:
+            try:
+                db = self._connect()
+                db.executemany(
+                    f"INSERT OR REPLACE INTO {self.table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [(*key, self.encode(value), now) for key, value in entries.items()],
+                )
+                self._writes_since_prune += len(entries)
+                if self._writes_since_prune >= self.prune_every:
+                    self._prune(db)
+                    self._writes_since_prune = 0
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"[{self.label} Error] {e}")
+
+    def _prune(self, db: sqlite3.Connection):
+        # Drop expired rows, then the oldest ones beyond the row cap
+        db.execute(f"DELETE FROM {self.table} WHERE created<?", (time.time() - self.ttl,))
+        db.execute(
+            f"DELETE FROM {self.table} WHERE rowid IN ("
+            f"SELECT rowid FROM {self.table} ORDER BY created DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    # -----------------------------
+    # Both tiers
+    # -----------------------------
+    def get(self, key):
+        """Memory first, then disk (promoting a hit into memory); None if neither has it."""
+        value = self.get_memory(key)
+        if value is None:
+            value = self.lookup_disk([key]).get(key)
+            if value is not None:
+                self.remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self.remember(key, value)
+        self.persist({key: value})
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "memory_entries": len(self._memory), "persistent": self.persistent}
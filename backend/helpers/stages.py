@@ -0,0 +1,93 @@
+import time
+import asyncio
+import inspect
+from helpers.aio import run_blocking
+
+
+# -----------------------------
+# Declarative stage graph
+# -----------------------------
+class ref:
+    """Placeholder for another stage's result inside a stage's arguments."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class stage:
+    """A unit of work: `fn(*args, **kwargs)` once every referenced stage has finished."""
+
+    def __init__(self, fn, *args, after=(), **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.deps = {a.name for a in (*args, *kwargs.values()) if isinstance(a, ref)} | set(after)
+
+    def resolve(self, results: dict):
+        args = [results[a.name] if isinstance(a, ref) else a for a in self.args]
+        kwargs = {k: results[v.name] if isinstance(v, ref) else v for k, v in self.kwargs.items()}
+        return args, kwargs
+
+
+def _check_graph(stages: dict):
+    for name, node in stages.items():
+        missing = node.deps - stages.keys()
+        if missing:
+            raise ValueError(f"Stage '{name}' depends on unknown stage(s): {', '.join(sorted(missing))}")
+
+    done, visiting = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Stage graph has a cycle through '{name}'")
+        visiting.add(name)
+        for dep in stages[name].deps:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in stages:
+        visit(name)
+
+
+async def run_stages(label: str, timings: dict | None = None, **stages) -> dict:
+    """Run independent stages concurrently and return {name: result}.
+
+    Blocking callables go to the shared stage pool; coroutine functions are
+    awaited directly. Per-stage durations (ms) are added to `timings`.
+    """
+    _check_graph(stages)
+
+    timings = {} if timings is None else timings
+    results = {}
+    tasks = {}
+    started = time.perf_counter()
+
+    async def execute(name: str, node: stage):
+        if node.deps:
+            await asyncio.gather(*(tasks[dep] for dep in node.deps))
+        args, kwargs = node.resolve(results)
+        stage_started = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(node.fn):
+                results[name] = await node.fn(*args, **kwargs)
+            else:
+                results[name] = await run_blocking(node.fn, *args, **kwargs)
+        finally:
+            timings[name] = round((time.perf_counter() - stage_started) * 1000, 1)
+
+    for name, node in stages.items():
+        tasks[name] = asyncio.ensure_future(execute(name, node))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    finally:
+        for task in tasks.values():
+            task.cancel()
+        total = round((time.perf_counter() - started) * 1000, 1)
+        summary = ", ".join(f"{name}={ms}ms" for name, ms in timings.items())
+        print(f"[STAGES {label}] {summary} | wall={total}ms")
+
+    return results
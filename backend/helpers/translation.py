@@ -0,0 +1,221 @@
+import os
+import json
+import threading
+from concurrent.futures import Future
+from typing import List
+from helpers.sqlite_cache import TieredCache
+
+# -----------------------------
+# Translation Configuration
+# -----------------------------
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")
+TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", ".translation_cache.sqlite3")
+TRANSLATION_MEMORY_ITEMS = int(os.getenv("TRANSLATION_MEMORY_ITEMS", "4096"))
+TRANSLATION_PHRASEBOOK = os.getenv("TRANSLATION_PHRASEBOOK", "")
+TRANSLATION_TIMEOUT = float(os.getenv("TRANSLATION_TIMEOUT", "30"))
+# The persistent tier holds raw caller utterances, so it is bounded in age and size
+TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+TRANSLATION_CACHE_MAX_ROWS = int(os.getenv("TRANSLATION_CACHE_MAX_ROWS", "50000"))
+TRANSLATION_PRUNE_EVERY = 256  # writes between clean-ups of the persistent tier
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class GoogleTranslateBackend:
+    """Google Translate through deep_translator; a batch is sent as one request when possible."""
+    name = "google"
+    max_chars = 4500
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        from deep_translator import GoogleTranslator
+
+        translator = GoogleTranslator(source=source, target=target)
+        joined = "\n".join(texts)
+
+        # One round trip for the whole batch when the lines can be split back apart
+        if len(texts) > 1 and len(joined) <= self.max_chars and not any("\n" in t for t in texts):
+            lines = (translator.translate(joined) or "").split("\n")
+            if len(lines) == len(texts):
+                return [line.strip() for line in lines]
+
+        return [translator.translate(text) for text in texts]
+
+
+class LocalTranslateBackend:
+    """Offline stand-in: phrasebook lookups, otherwise the text is returned unchanged."""
+    name = "local"
+
+    def __init__(self, phrasebook_path: str = TRANSLATION_PHRASEBOOK):
+        self.phrasebook = {}
+        if phrasebook_path:
+            # {"english>hindi": {"Hello": "नमस्ते"}, ...}
+            with open(phrasebook_path, encoding="utf-8") as f:
+                self.phrasebook = json.load(f)
+
+    def translate(self, texts: List[str], source: str, target: str) -> List[str]:
+        phrases = self.phrasebook.get(f"{source}>{target}", {})
+        return [phrases.get(text, text) for text in texts]
+
+
+BACKENDS = {
+    "google": GoogleTranslateBackend,
+    "local": LocalTranslateBackend,
+}
+
+_backend = None
+
+
+def register_backend(name: str, factory):
+    BACKENDS[name] = factory
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        if TRANSLATION_BACKEND not in BACKENDS:
+            print(f"[Translation Warning] Unknown backend '{TRANSLATION_BACKEND}', using 'local'")
+        _backend = BACKENDS.get(TRANSLATION_BACKEND, LocalTranslateBackend)()
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def backend_name() -> str:
+    # Part of every cache key: results of one backend are never served for another
+    backend = get_backend()
+    return getattr(backend, "name", type(backend).__name__)
+
+
+# -----------------------------
+# Cache: in-memory LRU over a persistent SQLite table
+# -----------------------------
+_cache = TieredCache(
+    TRANSLATION_CACHE_PATH,
+    "translation_cache",
+    ("backend", "source", "target", "text"),
+    "translation",
+    memory_items=TRANSLATION_MEMORY_ITEMS,
+    ttl=TRANSLATION_CACHE_TTL,
+    max_rows=TRANSLATION_CACHE_MAX_ROWS,
+    prune_every=TRANSLATION_PRUNE_EVERY,
+    # The old table was not keyed by backend and may hold untranslated pass-through rows
+    replaces="translations",
+    label="Translation Cache",
+)
+_inflight = {}
+_lock = threading.Lock()
+
+_stats = {
+    "coalesced": 0,
+    "backend_calls": 0,
+    "errors": 0,
+}
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def translate_batch(texts: List[str], source: str, target: str) -> List[str]:
+    """Translate several strings with at most one backend call; failures return the input text."""
+    source = source.lower()
+    target = target.lower()
+    if source == target or not texts:
+        return list(texts)
+
+    backend = backend_name()
+    results = {}
+    waiting = {}
+    to_fetch = []
+
+    with _lock:
+        for text in dict.fromkeys(texts):
+            key = (backend, source, target, text)
+            cached = _cache.get_memory(key) if text.strip() else text
+            if cached is not None:
+                results[key] = cached
+            elif key in _inflight:
+                # Another request is already translating this exact string
+                waiting[key] = _inflight[key]
+                _stats["coalesced"] += 1
+            else:
+                future = Future()
+                _inflight[key] = future
+                to_fetch.append((key, future))
+
+    if to_fetch:
+        _resolve(to_fetch, source, target, results)
+
+    for key, future in waiting.items():
+        try:
+            results[key] = future.result(timeout=TRANSLATION_TIMEOUT)
+        except Exception:
+            results[key] = key[3]
+
+    return [results[(backend, source, target, text)] for text in texts]
+
+
+def _resolve(to_fetch, source, target, results):
+    translated = {}
+    failure = None
+    try:
+        keys = [key for key, _ in to_fetch]
+        translated.update(_cache.lookup_disk(keys))
+        missing = [key for key in keys if key not in translated]
+
+        if missing:
+            fresh = {}
+            try:
+                with _lock:
+                    _stats["backend_calls"] += 1
+                outputs = get_backend().translate([key[3] for key in missing], source, target)
+                fresh = {key: out for key, out in zip(missing, outputs) if out}
+            except Exception as e:
+                print(f"[Translation Error] {e}")
+                with _lock:
+                    _stats["errors"] += 1
+            # Pass-through results (output == input) are not persisted: they are what a
+            # failing or offline backend returns, and would outlive a switch of backend
+            persistent = {key: out for key, out in fresh.items() if out != key[3]}
+            _cache.persist(persistent)
+            translated.update(fresh)
+    except Exception as e:
+        failure = e
+        print(f"[Translation Error] {e}")
+        with _lock:
+            _stats["errors"] += 1
+    finally:
+        # Always settle the futures, or later requests for these strings would wait out the timeout
+        with _lock:
+            for key, future in to_fetch:
+                value = translated.get(key)
+                if value is not None:
+                    _cache.remember(key, value)
+                # Untranslatable strings fall back to the original text, uncached
+                results[key] = value if value is not None else key[3]
+                if not future.done():
+                    if value is None and failure is not None:
+                        future.set_exception(failure)
+                    else:
+                        future.set_result(results[key])
+                _inflight.pop(key, None)
+
+
+def translate_text(text: str, source: str, target: str) -> str:
+    return translate_batch([text], source, target)[0]
+
+
+def translation_stats() -> dict:
+    cache = _cache.stats()
+    with _lock:
+        hits = cache["memory_hits"] + cache["disk_hits"] + _stats["coalesced"]
+        lookups = hits + cache["misses"]
+        return {
+            **cache,
+            **_stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "backend": backend_name(),
+        }
@@ -0,0 +1,229 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# -----------------------------
+# Cache Configuration
+# -----------------------------
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", ".tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+
+KEY_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+# -----------------------------
+# Cache State
+# -----------------------------
+_memory = OrderedDict()
+_memory_bytes = 0
+_disk_bytes = None
+_lock = threading.Lock()
+_evict_lock = threading.Lock()
+
+_stats = {
+    "memory_hits": 0,
+    "disk_hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "evictions": 0,
+}
+
+
+def cache_key(text: str, voice: str, rate: str) -> str:
+    raw = f"{voice}\x00{rate}\x00{text}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _disk_path(key: str) -> str:
+    return os.path.join(TTS_CACHE_DIR, key[:2], f"{key}.mp3")
+
+
+def _text_path(key: str) -> str:
+    return os.path.join(TTS_CACHE_DIR, key[:2], f"{key}.json")
+
+
+# -----------------------------
+# In-memory LRU
+# -----------------------------
+def _remember(key: str, audio: bytes):
+    global _memory_bytes
+    if len(audio) > TTS_CACHE_MEMORY_BYTES:
+        return
+    if key in _memory:
+        _memory_bytes -= len(_memory.pop(key))
+    _memory[key] = audio
+    _memory_bytes += len(audio)
+    while _memory_bytes > TTS_CACHE_MEMORY_BYTES:
+        _, evicted = _memory.popitem(last=False)
+        _memory_bytes -= len(evicted)
+
+
+# -----------------------------
+# On-disk store with size-bounded eviction
+# -----------------------------
+def _scan_disk_bytes() -> int:
+    total = 0
+    for root, _, files in os.walk(TTS_CACHE_DIR):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _evict_disk(target_bytes: int):
+    global _disk_bytes
+    # One pass at a time, and never under _lock: lookups keep going during the walk
+    if not _evict_lock.acquire(blocking=False):
+        return
+    try:
+        entries = []
+        for root, _, files in os.walk(TTS_CACHE_DIR):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+
+        # Oldest first; hits refresh the mtime so this is least-recently-used
+        entries.sort()
+        for _, size, path in entries:
+            with _lock:
+                if _disk_bytes <= target_bytes:
+                    break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            with _lock:
+                _disk_bytes -= size
+                _stats["evictions"] += 1
+    finally:
+        _evict_lock.release()
+
+
+def get_cached_audio(text: str, voice: str, rate: str) -> bytes | None:
+    key = cache_key(text, voice, rate)
+    with _lock:
+        audio = _memory.get(key)
+        if audio is not None:
+            _memory.move_to_end(key)
+            _stats["memory_hits"] += 1
+            return audio
+
+    path = _disk_path(key)
+    try:
+        with open(path, "rb") as f:
+            audio = f.read()
+        os.utime(path)
+    except OSError:
+        with _lock:
+            _stats["misses"] += 1
+        return None
+
+    with _lock:
+        _remember(key, audio)
+        _stats["disk_hits"] += 1
+    return audio
+
+
+def _write_file(path: str, data: bytes) -> bool:
+    """Atomically write a cache file, keep the disk byte count exact and evict past the cap."""
+    global _disk_bytes
+    try:
+        # Overwriting an entry only changes the total by the size difference
+        try:
+            previous_size = os.path.getsize(path)
+        except OSError:
+            previous_size = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"[TTS Cache Error] {e}")
+        return False
+
+    with _lock:
+        needs_scan = _disk_bytes is None
+        if not needs_scan:
+            _disk_bytes += len(data) - previous_size
+
+    if needs_scan:
+        # First write in this process: count what is already on disk (including this file)
+        total = _scan_disk_bytes()
+        with _lock:
+            if _disk_bytes is None:
+                _disk_bytes = total
+            else:
+                _disk_bytes += len(data) - previous_size
+
+    with _lock:
+        over_limit = _disk_bytes > TTS_CACHE_MAX_BYTES
+    if over_limit:
+        _evict_disk(int(TTS_CACHE_MAX_BYTES * 0.9))
+    return True
+
+
+def store_audio(text: str, voice: str, rate: str, audio: bytes):
+    if not audio:
+        return
+
+    key = cache_key(text, voice, rate)
+    written = _write_file(_disk_path(key), audio)
+    with _lock:
+        _remember(key, audio)
+        if written:
+            _stats["stores"] += 1
+
+
+# -----------------------------
+# Text behind streamed-audio links
+# -----------------------------
+def store_stream_text(text: str, voice: str, rate: str) -> str | None:
+    """Park the text of a streamed-audio link next to its audio; returns the short id to sign."""
+    key = cache_key(text, voice, rate)
+    path = _text_path(key)
+    try:
+        # Same text and voice, same id: refresh it so eviction sees it as recent
+        os.utime(path)
+        return key
+    except OSError:
+        pass
+    payload = json.dumps({"text": text, "voice": voice}, ensure_ascii=False).encode("utf-8")
+    return key if _write_file(path, payload) else None
+
+
+def load_stream_text(key: str) -> tuple | None:
+    """(text, voice) stored under `key`, or None once it has been evicted."""
+    if not KEY_PATTERN.fullmatch(key):
+        return None
+    try:
+        with open(_text_path(key), encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[TTS Cache Error] {e}")
+        return None
+    return entry["text"], entry["voice"]
+
+
+def tts_cache_stats() -> dict:
+    with _lock:
+        hits = _stats["memory_hits"] + _stats["disk_hits"]
+        lookups = hits + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(_memory),
+            "memory_bytes": _memory_bytes,
+            "disk_bytes": _disk_bytes,
+            "max_disk_bytes": TTS_CACHE_MAX_BYTES,
+            "max_memory_bytes": TTS_CACHE_MEMORY_BYTES,
+        }
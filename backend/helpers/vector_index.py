@@ -0,0 +1,136 @@
+import os
+import numpy as np
+from typing import List
+from helpers.mmap_files import ArrayFiles
+
+# -----------------------------
+# Vector Index Configuration
+# -----------------------------
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", os.path.join(".chroma", "vectors"))
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "int8")  # "int8" or "none"
+VECTOR_RERANK_FACTOR = int(os.getenv("VECTOR_RERANK_FACTOR", "8"))  # candidates = top_k * factor
+VECTOR_SCAN_BLOCK_ROWS = int(os.getenv("VECTOR_SCAN_BLOCK_ROWS", "8192"))
+
+
+_files = ArrayFiles(VECTOR_INDEX_DIR, {"matrix": "f32.npy", "codes": "i8.npy", "scales": "scale.npy"})
+
+
+def _top_k(scores: np.ndarray, k: int):
+    """Per-row (indices, scores) of the k largest values, best first."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        # O(n) selection of the k best, then sort only those k
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.tile(np.arange(scores.shape[1]), (scores.shape[0], 1))
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+# -----------------------------
+# In-process cosine search
+# -----------------------------
+class VectorIndex:
+    """Row-normalized vectors; cosine similarity is a matrix product.
+
+    With int8 codes the scan runs over one byte per dimension and only the
+    few candidate rows are read back from the float32 file for exact
+    re-ranking, so most of that file never becomes resident.
+    """
+
+    def __init__(self, ids: List[str], matrix: np.ndarray, stamp: str = "", codes=None, scales=None):
+        self.ids = ids
+        self.matrix = matrix
+        self.stamp = stamp
+        self.codes = codes
+        self.scales = scales
+        self.positions = {id_: row for row, id_ in enumerate(ids)}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    @staticmethod
+    def quantize(matrix: np.ndarray):
+        """Symmetric per-row int8: row ≈ codes * scale."""
+        peaks = np.abs(matrix).max(axis=1) if len(matrix) else np.zeros(0, dtype=np.float32)
+        scales = (peaks / 127.0).astype(np.float32)
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(matrix / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales
+
+    @classmethod
+    def build(cls, name: str, ids: List[str], embeddings, stamp: str) -> "VectorIndex":
+        """Normalize and quantize once, write to disk, and return the memory-mapped copy."""
+        matrix = cls.normalize(embeddings) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        codes, scales = cls.quantize(matrix)
+        _files.save(
+            name,
+            {"matrix": matrix, "codes": codes, "scales": scales},
+            {"stamp": stamp, "dim": int(matrix.shape[1]), "ids": list(ids)},
+        )
+        return cls.load(name, stamp)
+
+    @classmethod
+    def load(cls, name: str, stamp: str = None, quantization: str = VECTOR_QUANTIZATION) -> "VectorIndex | None":
+        """Open a saved index read-only; None if missing or built from other data."""
+        loaded = _files.load(name, ["matrix", "codes", "scales"] if quantization == "int8" else ["matrix"], stamp)
+        if loaded is None:
+            return None
+        meta, arrays = loaded
+        matrix, codes, scales = arrays["matrix"], arrays.get("codes"), arrays.get("scales")
+        if matrix.shape[0] != len(meta["ids"]) or (codes is not None and codes.shape != matrix.shape):
+            return None
+        return cls(meta["ids"], matrix, meta.get("stamp", ""), codes, scales)
+
+    def resident_bytes(self) -> int:
+        """Bytes a full scan touches per process (the float file is only sampled when quantized)."""
+        if self.codes is not None:
+            return int(self.codes.nbytes + self.scales.nbytes)
+        return int(self.matrix.nbytes)
+
+    def _approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        scores = np.empty((queries.shape[0], len(self.ids)), dtype=np.float32)
+        # Blocks keep the float32 copy of the codes small
+        for start in range(0, len(self.ids), VECTOR_SCAN_BLOCK_ROWS):
+            stop = min(start + VECTOR_SCAN_BLOCK_ROWS, len(self.ids))
+            block = self.codes[start:stop].astype(np.float32)
+            scores[:, start:stop] = (queries @ block.T) * self.scales[start:stop]
+        return scores
+
+    def rows_for(self, ids: List[str]) -> List[int]:
+        return [self.positions[id_] for id_ in ids if id_ in self.positions]
+
+    def search(self, queries, top_k: int = 5, exact: bool = False, rows: List[int] = None) -> List[List[tuple]]:
+        """Top-k (id, score) per query row, best first; `rows` restricts the search to a subset."""
+        queries = self.normalize(queries)
+        if not len(self.ids) or (rows is not None and not len(rows)):
+            return [[] for _ in range(queries.shape[0])]
+
+        if rows is not None:
+            # Pre-filtered subsets are small: exact scores on just those rows
+            rows = np.asarray(rows)
+            subset_best, best_scores = _top_k(queries @ np.asarray(self.matrix[rows]).T, top_k)
+            best = rows[subset_best]
+        elif self.codes is None or exact:
+            best, best_scores = _top_k(queries @ self.matrix.T, top_k)
+        else:
+            candidates, _ = _top_k(self._approximate_scores(queries), top_k * VECTOR_RERANK_FACTOR)
+            # Exact float scores for the candidate rows only
+            rescored = np.einsum("qd,qcd->qc", queries, np.asarray(self.matrix[candidates]))
+            order, best_scores = _top_k(rescored, top_k)
+            best = np.take_along_axis(candidates, order, axis=1)
+
+        return [
+            [(self.ids[i], float(s)) for i, s in zip(row, row_scores)]
+            for row, row_scores in zip(best, best_scores)
+        ]
@@ -1,10 +1,28 @@
+import os
+import re
+import queue
 import asyncio
 import edge_tts
 import base64
 from io import BytesIO
+from collections import deque
 import random
-from flask import request, jsonify, session
-from deep_translator import GoogleTranslator
+from flask import request, session, current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature
+from helpers.tts_cache import get_cached_audio, store_audio, store_stream_text, load_stream_text
+from helpers.prompt_bank import get_prompt_audio
+from helpers.translation import translate_text
+from helpers.background_loop import submit, run_in_background
+
+TTS_RATE = "+20%"
+TTS_STREAM_MAX_AGE = 600  # seconds a streamed-audio link stays valid
+TTS_TIMEOUT = float(os.getenv("TTS_TIMEOUT", "60"))
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "16"))
+TTS_MAX_PER_VOICE = int(os.getenv("TTS_MAX_PER_VOICE", "8"))
+TTS_PIPELINE_DEPTH = int(os.getenv("TTS_PIPELINE_DEPTH", "2"))  # sentences rendered ahead of playback
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?।॥])\s+|\n+')
+MIN_SEGMENT_CHARS = 40
 
 VOICE_OPTIONS = {
     'en': {
@@ -26,30 +44,17 @@ def translate_text_to_english(text: str, language: str = 'english') -> str:
     language = language.lower()
     if language == 'english':
         return text
-    try:
-        return GoogleTranslator(source=language, target='english').translate(text)
-    except Exception as e:
-        print(f"[Translation Error] {e}")
-        return text
+    return translate_text(text, source=language, target='english')
 
 
 def translate_text_to_session_language(text: str, session_lang: str) -> str:
     session_lang = session_lang.lower()
     if session_lang == "english":
         return text
-    try:
-        return GoogleTranslator(source='english', target=session_lang).translate(text)
-    except Exception as e:
-        print(f"[Translation Error] {e}")
-        return text
+    return translate_text(text, source='english', target=session_lang)
 
 
-def generate_tts_audio(text, lang='en', gender='female'):
-    text = text.strip()
-    if not text:
-        print("[TTS Error] Empty text provided.")
-        return None
-
+def select_voice(lang='en', gender='female'):
     lang = lang.lower()
     gender = gender.lower()
 
@@ -64,34 +69,241 @@ def generate_tts_audio(text, lang='en', gender='female'):
     session_gender_key = f'bot_voice_gender_{lang}'
 
     if session.get(session_key) and session.get(session_gender_key) == gender:
-        selected_voice = session[session_key]
-    else:
-        selected_voice = random.choice(VOICE_OPTIONS[lang][gender])
-        session[session_key] = selected_voice
-        session[session_gender_key] = gender
+        return session[session_key]
+
+    selected_voice = random.choice(VOICE_OPTIONS[lang][gender])
+    session[session_key] = selected_voice
+    session[session_gender_key] = gender
+    return selected_voice
+
+
+def wants_streamed_audio() -> bool:
+    # Callers such as the IVR server opt in with {"audio_format": "stream"}
+    data = request.get_json(silent=True) or {}
+    return data.get('audio_format') == 'stream' and _stream_serializer() is not None
+
+
+def _stream_serializer():
+    # Tokens make the backend synthesize whatever text they carry, so they are
+    # only issued and accepted when a real SECRET_KEY is configured
+    if not current_app.secret_key:
+        return None
+    return URLSafeTimedSerializer(current_app.secret_key, salt='tts-stream')
+
+
+def register_tts_stream(text, voice) -> str | None:
+    serializer = _stream_serializer()
+    if serializer is None:
+        print("[TTS Stream Error] SECRET_KEY is not set; streamed audio links are disabled.")
+        return None
+    # Only a short id is signed into the URL; long answers would not fit in a request line.
+    # The text waits in the TTS cache directory, which every worker on this host reads.
+    key = store_stream_text(text, voice, TTS_RATE)
+    if key is None:
+        return None
+    return f"/tts/stream/{serializer.dumps(key)}"
+
+
+def resolve_tts_stream(token):
+    serializer = _stream_serializer()
+    if serializer is None:
+        print("[TTS Stream Error] SECRET_KEY is not set; rejecting stream token.")
+        return None
+    try:
+        key = serializer.loads(token, max_age=TTS_STREAM_MAX_AGE)
+    except BadSignature as e:
+        print(f"[TTS Stream Error] Invalid or expired token: {e}")
+        return None
+    return load_stream_text(str(key))
+
+
+def generate_tts_audio(text, lang='en', gender='female'):
+    text = text.strip()
+    if not text:
+        print("[TTS Error] Empty text provided.")
+        return None
+
+    selected_voice = select_voice(lang, gender)
+
+    if wants_streamed_audio():
+        stream_url = register_tts_stream(text, selected_voice)
+        if stream_url:
+            return stream_url
+
+    # Whole pre-rendered prompts; synthesized audio is cached per sentence inside the pipeline
+    prompt_audio = get_prompt_audio(text, selected_voice, TTS_RATE)
+    if prompt_audio:
+        print(f"[TTS Prompt Bank] Hit for voice {selected_voice}")
+        return base64.b64encode(prompt_audio).decode('utf-8')
 
     print(f"Generating TTS for: '{text}' using voice: {selected_voice}")
 
     try:
-        audio_base64 = asyncio.run(_synthesize_tts(text, selected_voice))
-        if not audio_base64:
+        audio_bytes = run_in_background(_synthesize_tts(text, selected_voice), timeout=TTS_TIMEOUT)
+        if not audio_bytes:
             print("[TTS Error] Audio synthesis returned empty result.")
             return None
-        return audio_base64
+        return base64.b64encode(audio_bytes).decode('utf-8')
     except Exception as e:
         print(f"[TTS Error] {e}")
         return None
 
 
-async def _synthesize_tts(text, voice):
+def prefetch_tts_audio(text, lang='en', gender='female'):
+    """Render `text` into the cache ahead of time so a later request for it is a hit."""
+    text = text.strip()
+    if not text:
+        return False
+
+    selected_voice = select_voice(lang, gender)
+    if get_prompt_audio(text, selected_voice, TTS_RATE):
+        return True
+
     try:
-        communicate = edge_tts.Communicate(text, voice, rate="+20%")
-        stream = BytesIO()
+        return bool(run_in_background(_synthesize_tts(text, selected_voice), timeout=TTS_TIMEOUT))
+    except Exception as e:
+        print(f"[TTS Prefetch Error] {e}")
+        return False
+
+
+def stream_tts_audio(text, voice):
+    prompt_audio = get_prompt_audio(text, voice, TTS_RATE)
+    if prompt_audio:
+        yield prompt_audio
+        return
+
+    print(f"Streaming TTS for: '{text}' using voice: {voice}")
+
+    chunks = queue.Queue()
+
+    async def produce():
+        try:
+            async for data in _pipelined_tts_chunks(text, voice):
+                chunks.put(data)
+            return True
+        except Exception as e:
+            print(f"[TTS Streaming Error] {e}")
+            return False
+        finally:
+            chunks.put(None)
+
+    future = submit(produce())
+    try:
+        while True:
+            data = chunks.get(timeout=TTS_TIMEOUT)
+            if data is None:
+                break
+            yield data
+    except queue.Empty:
+        print("[TTS Streaming Error] Timed out waiting for audio.")
+    finally:
+        future.cancel()
+
+
+# -----------------------------
+# Synthesis on the shared loop
+# -----------------------------
+_tts_limit = None
+_voice_limits = {}
+
+
+def _tts_limits(voice):
+    # Concurrency caps only: every segment still opens its own edge-tts websocket.
+    # Only ever called on the background loop thread, so no locking needed
+    global _tts_limit
+    if _tts_limit is None:
+        _tts_limit = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+    if voice not in _voice_limits:
+        _voice_limits[voice] = asyncio.Semaphore(TTS_MAX_PER_VOICE)
+    return _tts_limit, _voice_limits[voice]
+
+
+async def _stream_tts_chunks(text, voice):
+    global_limit, voice_limit = _tts_limits(voice)
+    async with global_limit, voice_limit:
+        communicate = edge_tts.Communicate(text, voice, rate=TTS_RATE)
         async for chunk in communicate.stream():
             if chunk["type"] == "audio":
-                stream.write(chunk["data"])
-        stream.seek(0)
-        return base64.b64encode(stream.read()).decode('utf-8')
+                yield chunk["data"]
+
+
+def _cached_audio(text, voice):
+    # Pre-rendered prompts first, then the synthesized-audio cache
+    return get_prompt_audio(text, voice, TTS_RATE) or get_cached_audio(text, voice, TTS_RATE)
+
+
+async def _cached_audio_async(text, voice):
+    # Cache reads and writes touch disk; keep them off the shared loop so other streams keep flowing
+    return await asyncio.get_running_loop().run_in_executor(None, _cached_audio, text, voice)
+
+
+async def _store_audio_async(text, voice, audio):
+    await asyncio.get_running_loop().run_in_executor(None, store_audio, text, voice, TTS_RATE, audio)
+
+
+def split_sentences(text):
+    parts = [part.strip() for part in SENTENCE_BOUNDARY.split(text) if part and part.strip()]
+    segments = []
+    for part in parts:
+        # Fold very short fragments into the previous sentence to keep prosody natural
+        if segments and len(segments[-1]) < MIN_SEGMENT_CHARS:
+            segments[-1] = f"{segments[-1]} {part}"
+        else:
+            segments.append(part)
+    return segments
+
+
+async def _segment_audio(segment, voice):
+    cached = await _cached_audio_async(segment, voice)
+    if cached:
+        return cached
+    audio = b"".join([data async for data in _stream_tts_chunks(segment, voice)])
+    await _store_audio_async(segment, voice, audio)
+    return audio
+
+
+async def _pipelined_tts_chunks(text, voice):
+    segments = split_sentences(text) or [text]
+    pending = deque()
+
+    def schedule(index):
+        pending.append(asyncio.ensure_future(_segment_audio(segments[index], voice)))
+
+    try:
+        # Later sentences render while the first one is being delivered
+        next_index = 1
+        while next_index < len(segments) and len(pending) < TTS_PIPELINE_DEPTH:
+            schedule(next_index)
+            next_index += 1
+
+        first = await _cached_audio_async(segments[0], voice)
+        if first:
+            yield first
+        else:
+            received = []
+            async for data in _stream_tts_chunks(segments[0], voice):
+                received.append(data)
+                yield data
+            await _store_audio_async(segments[0], voice, b"".join(received))
+
+        while pending:
+            audio = await pending.popleft()
+            if next_index < len(segments):
+                schedule(next_index)
+                next_index += 1
+            if audio:
+                yield audio
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _synthesize_tts(text, voice):
+    try:
+        stream = BytesIO()
+        async for data in _pipelined_tts_chunks(text, voice):
+            stream.write(data)
+        return stream.getvalue()
     except Exception as e:
         print(f"[TTS Streaming Error] {e}")
         return None
@@ -0,0 +1,24 @@
+from flask import Blueprint, jsonify
+from helpers.tts_cache import tts_cache_stats
+from helpers.translation import translation_stats
+from helpers.chroma_helpers import indexing_status
+from helpers.query_embeddings import query_embedding_stats
+
+bp = Blueprint('metrics', __name__, url_prefix='/metrics')
+
+@bp.route('/tts-cache', methods=['GET'])
+def tts_cache():
+    return jsonify(tts_cache_stats())
+
+@bp.route('/translation', methods=['GET'])
+def translation():
+    return jsonify(translation_stats())
+
+@bp.route('/indexing', methods=['GET'])
+def indexing():
+    return jsonify(indexing_status())
+
+
+@bp.route('/query-embeddings', methods=['GET'])
+def query_embeddings():
+    return jsonify(query_embedding_stats())
\ No newline at end of file
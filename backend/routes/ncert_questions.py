@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, jsonify, session
 from helpers.chatters import chat_with_history
-from helpers.chroma_helpers import chroma_ncert_books
-from helpers.voice_helpers import generate_tts_audio, translate_text_to_session_language, translate_text_to_english
+from helpers.chroma_helpers import chroma_ncert_books, DatasetNotReady
+from helpers.voice_helpers import generate_tts_audio, translate_text_to_session_language, translate_text_to_english, prefetch_tts_audio
 from helpers.email_helper import send_email
+from helpers.aio import run_blocking
+from helpers.stages import run_stages, stage, ref
 import re
 
 bp = Blueprint('ncert_questions', __name__, url_prefix='/ncert-questions')
@@ -20,7 +22,7 @@ def index():
     return render_template('components/ncert_questions.html')
 
 @bp.route('/ask', methods=['POST'])
-def ask_ncert_question():
+async def ask_ncert_question():
     try:
         data = request.json
         prompt = data.get('prompt', '').strip()
@@ -41,7 +43,7 @@ def ask_ncert_question():
             return jsonify({
                 'status': 'error',
                 'response': msg,
-                'audio': generate_tts_audio(msg, lang=lang_code)
+                'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code)
             }), 400
 
         # Email trigger phrases
@@ -63,7 +65,7 @@ def ask_ncert_question():
                 return jsonify({
                     'status': 'no_data',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'conversation_state': conversation_state
                 })
 
@@ -74,7 +76,7 @@ def ask_ncert_question():
                 return jsonify({
                     'status': 'awaiting_email',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'conversation_state': conversation_state
                 })
 
@@ -86,7 +88,8 @@ def ask_ncert_question():
                     session['confirmed_email'] = False
                     session['awaiting_email_input'] = False
 
-                    confirm_chat = chat_with_history(
+                    confirm_chat = await run_blocking(
+                        chat_with_history,
                         role="NCERT Email Assistant",
                         prompt=f"The user entered the email address: {email_to_check}.",
                         additional_instructions="Ask the user to confirm if this email is correct by checking the spelling and replying with yes or no.",
@@ -97,7 +100,7 @@ def ask_ncert_question():
                     return jsonify({
                         'status': 'awaiting_confirmation',
                         'response': confirm_msg,
-                        'audio': generate_tts_audio(confirm_msg, lang=lang_code),
+                        'audio': await run_blocking(generate_tts_audio, confirm_msg, lang=lang_code),
                         'conversation_state': conversation_state
                     })
 
@@ -108,7 +111,7 @@ def ask_ncert_question():
                 session['awaiting_email_input'] = False
 
                 if raw_data:
-                    sent = send_email(session['email'], raw_data)
+                    sent = await run_blocking(send_email, session['email'], raw_data)
                     msg = "✅ Email has been sent to your address!" if sent else "❌ Failed to send the email."
                 else:
                     msg = "There is no NCERT data to send."
@@ -116,7 +119,7 @@ def ask_ncert_question():
                 return jsonify({
                     'status': 'email_sent',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'conversation_state': conversation_state
                 })
 
@@ -126,7 +129,7 @@ def ask_ncert_question():
                 return jsonify({
                     'status': 'awaiting_confirmation',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'conversation_state': conversation_state
                 })
 
@@ -136,20 +139,20 @@ def ask_ncert_question():
                 return jsonify({
                     'status': 'awaiting_email',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'conversation_state': conversation_state
                 })
 
         ### NCERT LOGIC (only if no email-related question is detected)
         if not contains_phrase(prompt, email_triggers):
-            try:
-                translated_prompt = translate_text_to_english(prompt, language)
-                print("🔸 USER LANG TO ENGLISH:", translated_prompt)
-            except Exception as e:
-                print(f"[Translation Error] {e}")
-                translated_prompt = prompt
-
-            results = chroma_ncert_books(translated_prompt)
+            timings = {}
+            retrieval = await run_stages(
+                "ncert retrieval", timings,
+                translated_prompt=stage(translate_text_to_english, prompt, language),
+                results=stage(chroma_ncert_books, ref("translated_prompt")),
+            )
+            print("🔸 USER LANG TO ENGLISH:", retrieval["translated_prompt"])
+            results = retrieval["results"]
 
             if results:
                 raw_data = "\n".join(
@@ -166,22 +169,36 @@ def ask_ncert_question():
                     "generate a clear, helpful, and appropriate response using the provided content. "
                     "Store the full DATA in old_response_summary while summarizing as text."
                 )
+                follow_up = "Would you like me to email these notes to you?"
 
-                chat_result = chat_with_history(
-                    role="NCERT Question Answering Assistant",
-                    prompt=prompt,
-                    additional_instructions=additional_instructions,
-                    old_summary=old_summary
+                answer = await run_stages(
+                    "ncert answer", timings,
+                    chat=stage(
+                        chat_with_history,
+                        role="NCERT Question Answering Assistant",
+                        prompt=prompt,
+                        additional_instructions=additional_instructions,
+                        old_summary=old_summary
+                    ),
+                    # The fixed follow-up renders while the LLM is still generating
+                    follow_up_audio=stage(prefetch_tts_audio, follow_up, lang=lang_code),
+                    translated_response=stage(
+                        lambda chat: translate_text_to_session_language(chat['new_response'], language),
+                        ref("chat")
+                    ),
+                    audio=stage(
+                        lambda response: generate_tts_audio(response + " " + follow_up, lang=lang_code),
+                        ref("translated_response"),
+                        after=("follow_up_audio",)
+                    ),
                 )
-
-                translated_response = translate_text_to_session_language(chat_result['new_response'], language)
-                follow_up = "Would you like me to email these notes to you?"
+                translated_response = answer["translated_response"]
 
                 return jsonify({
                     'status': 'success',
                     'response': translated_response + "\n\n" + follow_up,
-                    'audio': generate_tts_audio(translated_response + " " + follow_up, lang=lang_code),
-                    'old_response_summary': chat_result['old_response_summary'],
+                    'audio': answer["audio"],
+                    'old_response_summary': answer["chat"]['old_response_summary'],
                     'conversation_state': conversation_state
                 })
 
@@ -191,16 +208,25 @@ def ask_ncert_question():
                 return jsonify({
                     'status': 'success',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'old_response_summary': old_summary,
                     'conversation_state': conversation_state
                 })
 
+    except DatasetNotReady:
+        # 200, not 5xx: the caller should simply ask again, not count a backend failure
+        msg = "I am still preparing the NCERT content. Please try again in a minute."
+        return jsonify({
+            'status': 'indexing',
+            'response': msg,
+            'audio': await run_blocking(generate_tts_audio, msg, lang="en")
+        })
+
     except Exception as e:
         print(f"[❌ ERROR] {e}")
         msg = "An error occurred while processing your NCERT question."
         return jsonify({
             'status': 'error',
             'response': msg,
-            'audio': generate_tts_audio(msg, lang="en")
+            'audio': await run_blocking(generate_tts_audio, msg, lang="en")
         }), 500
@@ -1,9 +1,11 @@
 from flask import Blueprint, render_template, request, jsonify, session
 import re
 from helpers.chatters import chat_with_history
-from helpers.chroma_helpers import chroma_karnataka_schools
-from helpers.voice_helpers import generate_tts_audio, translate_text_to_session_language, translate_text_to_english
+from helpers.chroma_helpers import chroma_karnataka_schools, DatasetNotReady
+from helpers.voice_helpers import generate_tts_audio, translate_text_to_session_language, translate_text_to_english, wants_streamed_audio
 from helpers.data_helpers import save_admission_request
+from helpers.aio import run_blocking
+from helpers.stages import run_stages, stage, ref
 
 bp = Blueprint('nearby_schools', __name__, url_prefix='/nearby-schools')
 
@@ -46,7 +48,7 @@ def index():
 
 
 @bp.route('/ask', methods=['POST'])
-def chatbot_response():
+async def chatbot_response():
     try:
         data = request.json
         print("data",data)
@@ -68,22 +70,28 @@ def chatbot_response():
             return jsonify({
                 'status': 'error',
                 'response': msg,
-                'audio': generate_tts_audio(msg, lang=lang_code)
+                'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code)
             }), 400
 
-        # Translate prompt to English for consistent intent detection
-        try:
-            translated_prompt_for_intent = translate_text_to_english(prompt, language)
-            print("[USER LANG TO ENG]", translated_prompt_for_intent)
-        except Exception as e:
-            print(f"[Translation Error] {e}")
-            translated_prompt_for_intent = prompt
+        # Translate prompt to English for consistent intent detection; the school
+        # search uses the same translation and starts as soon as it is ready
+        timings = {}
+        retrieval = await run_stages(
+            "nearby retrieval", timings,
+            translated_prompt=stage(translate_text_to_english, prompt, language),
+            results=stage(
+                lambda translated: chroma_karnataka_schools(translated) if match_intent(translated) == "find_schools" else None,
+                ref("translated_prompt")
+            ),
+        )
+        translated_prompt_for_intent = retrieval["translated_prompt"]
+        print("[USER LANG TO ENG]", translated_prompt_for_intent)
 
         intent = match_intent(translated_prompt_for_intent)
 
         # === FIND SCHOOLS ===
         if intent == "find_schools":
-            results = chroma_karnataka_schools(prompt)
+            results = retrieval["results"]
             if results:
                 def clean(value):
                     if isinstance(value, str) and '-' in value:
@@ -107,22 +115,35 @@ def chatbot_response():
                     "Also store the provided school DATA in old_response_summary too while summarizing as text"
                 )
 
-                chat_result = chat_with_history(
-                    role="School Finder and Admission Assistant",
-                    prompt=prompt,
-                    additional_instructions=additional_instructions,
-                    old_summary=old_summary
+                answer = await run_stages(
+                    "nearby answer", timings,
+                    chat=stage(
+                        chat_with_history,
+                        role="School Finder and Admission Assistant",
+                        prompt=prompt,
+                        additional_instructions=additional_instructions,
+                        old_summary=old_summary
+                    ),
+                    translated_response=stage(
+                        lambda chat: translate_text_to_session_language(chat['new_response'], language),
+                        ref("chat")
+                    ),
+                    audio=stage(
+                        lambda response: generate_tts_audio(response, lang=lang_code),
+                        ref("translated_response")
+                    ),
                 )
-
-                translated_response = translate_text_to_session_language(chat_result['new_response'], language)
-                audio_base64 = generate_tts_audio(translated_response, lang=lang_code)
-                import base64
-                # Decode the base64 string
-                audio_bytes = base64.b64decode(audio_base64)
-
-                # Write to file
-                with open("audio.mp3", "wb") as f:
-                    f.write(audio_bytes)
+                chat_result = answer["chat"]
+                translated_response = answer["translated_response"]
+                audio_base64 = answer["audio"]
+                if audio_base64 and not wants_streamed_audio():
+                    import base64
+                    # Decode the base64 string
+                    audio_bytes = base64.b64decode(audio_base64)
+
+                    # Write to file
+                    with open("audio.mp3", "wb") as f:
+                        f.write(audio_bytes)
 
                 return jsonify({
                     'status': 'success',
@@ -137,7 +158,7 @@ def chatbot_response():
                 return jsonify({
                     'status': 'success',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'old_response_summary': old_summary,
                     'conversation_state': conversation_state
                 })
@@ -155,12 +176,12 @@ def chatbot_response():
                 return jsonify({
                     'status': 'success',
                     'response': msg,
-                    'audio': generate_tts_audio(msg, lang=lang_code),
+                    'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                     'old_response_summary': old_summary,
                     'conversation_state': conversation_state
                 })
 
-            save_admission_request({
+            await run_blocking(save_admission_request, {
                 "student_name": conversation_state['student_name'],
                 "phone": conversation_state['phone'],
                 "address": conversation_state['address']
@@ -174,13 +195,14 @@ def chatbot_response():
             return jsonify({
                 'status': 'success',
                 'response': msg,
-                'audio': generate_tts_audio(msg, lang=lang_code),
+                'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                 'old_response_summary': old_summary,
                 'conversation_state': {}  # Reset
             })
 
         # === DEFAULT FALLBACK CHAT ===
-        chat_result = chat_with_history(
+        chat_result = await run_blocking(
+            chat_with_history,
             role="School Finder and Admission Assistant",
             prompt=prompt,
             additional_instructions="",
@@ -188,18 +210,19 @@ def chatbot_response():
         )
 
         # engl to session lang text
-        translated_response = translate_text_to_session_language(chat_result['new_response'], language)
+        translated_response = await run_blocking(translate_text_to_session_language, chat_result['new_response'], language)
         
         # text to audio 
-        audio_base64 = generate_tts_audio(translated_response, lang=lang_code)
+        audio_base64 = await run_blocking(generate_tts_audio, translated_response, lang=lang_code)
 
-        import base64
-        # Decode the base64 string
-        audio_bytes = base64.b64decode(audio_base64)
+        if audio_base64 and not wants_streamed_audio():
+            import base64
+            # Decode the base64 string
+            audio_bytes = base64.b64decode(audio_base64)
 
-        # Write to file
-        with open("audio.mp3", "wb") as f:
-            f.write(audio_bytes)
+            # Write to file
+            with open("audio.mp3", "wb") as f:
+                f.write(audio_bytes)
 
 
         return jsonify({
@@ -210,11 +233,20 @@ def chatbot_response():
             'conversation_state': conversation_state
         })
 
+    except DatasetNotReady:
+        # 200, not 5xx: the caller should simply ask again, not count a backend failure
+        msg = "I am still preparing the school list. Please try again in a minute."
+        return jsonify({
+            'status': 'indexing',
+            'response': msg,
+            'audio': await run_blocking(generate_tts_audio, msg, lang="en")
+        })
+
     except Exception as e:
         print(f"[Error] {e}")
         msg = "An internal error occurred while processing your request."
         return jsonify({
             'status': 'error',
             'response': msg,
-            'audio': generate_tts_audio(msg, lang="en") 
+            'audio': await run_blocking(generate_tts_audio, msg, lang="en")
         }), 500
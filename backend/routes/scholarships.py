@@ -1,8 +1,10 @@
 import os
 from flask import Blueprint, render_template, request, jsonify, session
 from helpers.chatters import chat_with_history
-from helpers.chroma_helpers import chroma_indian_scholarships
+from helpers.chroma_helpers import chroma_indian_scholarships, DatasetNotReady
 from helpers.voice_helpers import generate_tts_audio, translate_text_to_session_language, translate_text_to_english
+from helpers.aio import run_blocking
+from helpers.stages import run_stages, stage, ref
 
 bp = Blueprint('scholarships', __name__, url_prefix='/scholarships')
 
@@ -11,7 +13,7 @@ def index():
     return render_template('components/scholarships.html')
 
 @bp.route('/ask', methods=['POST'])
-def chatbot_response():
+async def chatbot_response():
     try:
         data = request.json
         print("data:", data)
@@ -41,21 +43,26 @@ def chatbot_response():
             return jsonify({
                 'status': 'error',
                 'response': msg,
-                'audio': generate_tts_audio(msg, lang=lang_code)
+                'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code)
             }), 400
 
-        translated_prompt = translate_text_to_english(prompt, language)
-        print("[INFO] Translated Prompt:", translated_prompt)
-
         print("[INFO] Fetching scholarship data from Chroma RAG...")
-        results = chroma_indian_scholarships(translated_prompt)
+        timings = {}
+        retrieval = await run_stages(
+            "scholarships retrieval", timings,
+            translated_prompt=stage(translate_text_to_english, prompt, language),
+            results=stage(chroma_indian_scholarships, ref("translated_prompt")),
+        )
+        translated_prompt = retrieval["translated_prompt"]
+        results = retrieval["results"]
+        print("[INFO] Translated Prompt:", translated_prompt)
 
         if not results:
             msg = "I couldn’t find any relevant scholarships. Please provide more details like eligibility or scholarship amount."
             return jsonify({
                 'status': 'success',
                 'response': msg,
-                'audio': generate_tts_audio(msg, lang=lang_code),
+                'audio': await run_blocking(generate_tts_audio, msg, lang=lang_code),
                 'old_response_summary': old_summary,
                 'conversation_state': conversation_state
             })
@@ -89,29 +96,47 @@ def chatbot_response():
 
         print("[INFO] Sending prompt to chat_with_history...")
 
-        chat_result = chat_with_history(
-            role="Scholarship Finder and Admission Assistant",
-            prompt=translated_prompt,
-            additional_instructions=additional_instructions,
-            old_summary=old_summary
+        answer = await run_stages(
+            "scholarships answer", timings,
+            chat=stage(
+                chat_with_history,
+                role="Scholarship Finder and Admission Assistant",
+                prompt=translated_prompt,
+                additional_instructions=additional_instructions,
+                old_summary=old_summary
+            ),
+            translated_response=stage(
+                lambda chat: translate_text_to_session_language(chat['new_response'], language),
+                ref("chat")
+            ),
+            audio=stage(
+                lambda response: generate_tts_audio(response, lang=lang_code),
+                ref("translated_response")
+            ),
         )
 
-        translated_response = translate_text_to_session_language(chat_result['new_response'], language)
-        audio_base64 = generate_tts_audio(translated_response, lang=lang_code)
-
         return jsonify({
             'status': 'success',
-            'response': translated_response,
-            'audio': audio_base64,
-            'old_response_summary': chat_result['old_response_summary'],
+            'response': answer["translated_response"],
+            'audio': answer["audio"],
+            'old_response_summary': answer["chat"]['old_response_summary'],
             'conversation_state': conversation_state
         })
 
+    except DatasetNotReady:
+        # 200, not 5xx: the caller should simply ask again, not count a backend failure
+        msg = "I am still preparing the scholarship list. Please try again in a minute."
+        return jsonify({
+            'status': 'indexing',
+            'response': msg,
+            'audio': await run_blocking(generate_tts_audio, msg, lang="en")
+        })
+
     except Exception as e:
         print(f"[ERROR] Internal server error: {e}")
         msg = "An internal error occurred while processing your request."
         return jsonify({
             'status': 'error',
             'response': msg,
-            'audio': generate_tts_audio(msg, lang="en")
+            'audio': await run_blocking(generate_tts_audio, msg, lang="en")
         }), 500
@@ -0,0 +1,18 @@
+from flask import Blueprint, Response, stream_with_context, jsonify
+from helpers.voice_helpers import resolve_tts_stream, stream_tts_audio
+
+bp = Blueprint('tts', __name__, url_prefix='/tts')
+
+@bp.route('/stream/<token>', methods=['GET'])
+def stream(token):
+    resolved = resolve_tts_stream(token)
+    if not resolved:
+        return jsonify({'status': 'error', 'message': 'Invalid or expired audio link'}), 404
+
+    text, voice = resolved
+    # Chunks are forwarded as edge_tts produces them (chunked audio/mpeg)
+    return Response(
+        stream_with_context(stream_tts_audio(text, voice)),
+        mimetype='audio/mpeg',
+        headers={'Cache-Control': 'no-store'}
+    )
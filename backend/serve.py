@@ -0,0 +1,35 @@
+"""Production launcher: uvicorn with several processes serving asgi:asgi_app.
+
+Flask is still WSGI underneath, so a2wsgi hands every request to one of
+BACKEND_THREADS threads. The async views of a process all run on one shared
+event loop (helpers/aio.py) rather than a new loop per request, and their
+blocking stages (translation, retrieval, LLM, TTS) overlap on the stage pool.
+"""
+import os
+import argparse
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend under uvicorn with several workers.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    args = parser.parse_args()
+
+    print(f"🚀 Serving asgi:asgi_app on {args.host}:{args.port} with {args.workers} workers")
+    uvicorn.run(
+        "asgi:asgi_app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_keep_alive=30,
+        log_level="info",
+    )
+
+
+if __name__ == '__main__':
+    main()
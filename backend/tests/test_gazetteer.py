@@ -0,0 +1,90 @@
+import pytest
+from helpers import row_store
+from helpers.row_store import RowStore
+from helpers.gazetteer import Gazetteer, normalize_place, skeleton
+
+COLUMNS = ["school_name", "village", "block", "district", "pincode"]
+ROWS = [
+    ("GHPS Hoskote", "HOSKOTE", "2905 - HOSKOTE", "2921 - BANGALORE RURAL", "562114"),
+    ("GLPS Nandagudi", "NANDAGUDI", "2905 - HOSKOTE", "2921 - BANGALORE RURAL", "562122"),
+    ("GHPS Hosur", "HOSUR", "2901 - BELGAUM", "2901 - BELGAUM", "590001"),
+    ("GHPS Hosur Hubli", "HOSUR", "2910 - HUBLI", "2910 - DHARWAD", "580001"),
+    ("KHPS Tilakwadi", "TILAKWADI", "2901 - BELGAUM", "2901 - BELGAUM", "590006"),
+    ("GHPS Shivajinagar", "SHIVAJINAGAR", "2901 - BELGAUM", "2901 - BELGAUM", "590006"),
+]
+
+
+@pytest.fixture
+def gazetteer(tmp_path, monkeypatch):
+    monkeypatch.setattr(row_store._files, "directory", str(tmp_path))
+    store = RowStore.build("schools", [f"r{i}" for i in range(len(ROWS))], COLUMNS, ROWS, "test")
+    return Gazetteer.build(store, ["village", "block", "district", "pincode", "missing"])
+
+
+def test_normalize_strips_codes_and_punctuation():
+    assert normalize_place("2901 - BELGAUM") == "belgaum"
+    assert normalize_place("Bangalore (Rural)") == "bangalore rural"
+
+
+def test_skeleton_ignores_spelling_variants():
+    assert skeleton("hosakote") == skeleton("hosakotte") == skeleton("hosaakote")
+
+
+def test_build_skips_unknown_columns(gazetteer):
+    assert gazetteer.fields == ["village", "block", "district", "pincode"]
+
+
+def test_matches_village_after_cue(gazetteer):
+    match = gazetteer.match("schools in Tilakwadi")
+
+    assert match.positions.tolist() == [4]
+    assert match.residual == []
+    assert match.places == [("tilakwadi", [("village", "tilakwadi", "exact")])]
+
+
+def test_phrase_names_every_level_it_matches(gazetteer):
+    match = gazetteer.match("schools in hoskote")
+
+    fields = {field for field, _, _ in match.places[0][1]}
+    assert fields == {"village", "block"}
+    assert match.positions.tolist() == [0, 1]
+    # The village hit outranks the block hit
+    assert match.ranked() == [0, 1]
+
+
+def test_misspelling_matches_only_after_cue(gazetteer):
+    assert gazetteer.match("tilakvadee schools") is not None  # same skeleton, no cue needed
+    assert gazetteer.match("shivajinagr schools") is None
+
+    match = gazetteer.match("schools near shivajinagr")
+    assert match.positions.tolist() == [5]
+    assert match.places[0][1] == [("village", "shivajinagar", "fuzzy")]
+
+
+def test_pincode_matches_exactly(gazetteer):
+    match = gazetteer.match("schools in 590006")
+
+    assert match.positions.tolist() == [4, 5]
+    assert gazetteer.match("schools in 590009") is None
+
+
+def test_separate_phrases_narrow_each_other(gazetteer):
+    assert gazetteer.match("schools in hosur").positions.tolist() == [2, 3]
+    assert gazetteer.match("schools in hosur, belgaum district").positions.tolist() == [2]
+
+
+def test_school_words_stay_in_residual(gazetteer):
+    match = gazetteer.match("government kannada medium schools in belgaum")
+
+    assert match.residual == ["government", "kannada", "medium"]
+    assert match.positions.tolist() == [2, 4, 5]
+
+
+def test_most_specific_level_wins(gazetteer):
+    match = gazetteer.match("schools in belgaum district near hosur")
+
+    assert match.most_specific().tolist() == [2]
+
+
+def test_no_place_returns_none(gazetteer):
+    assert gazetteer.match("which schools teach science") is None
@@ -0,0 +1,100 @@
+import pytest
+from helpers import lexical_index
+from helpers.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def make_index(docs: dict) -> BM25Index:
+    index = BM25Index()
+    for id_, text in docs.items():
+        index.add(id_, text)
+    return index
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What is the Pragati Scholarship?") == ["pragati", "scholarship"]
+
+
+def test_search_ranks_documents_covering_every_term_first():
+    index = make_index({
+        "a": "pragati scholarship for girls",
+        "b": "saksham scholarship for students",
+        "c": "girls hostel",
+    })
+
+    hits = index.search("pragati scholarship", top_k=3)
+
+    assert [id_ for id_, _, _ in hits] == ["a", "b"]
+    assert [covers for _, _, covers in hits] == [True, False]
+    assert index.count_covering("pragati scholarship") == 1
+
+
+def test_allowed_restricts_results():
+    index = make_index({"a": "science quiz", "b": "science notes", "c": "science lab"})
+
+    hits = index.search("science", top_k=5, allowed={"b", "c", "unknown"})
+
+    assert {id_ for id_, _, _ in hits} == {"b", "c"}
+    assert index.count_covering("science", allowed={"b"}) == 1
+
+
+def test_readding_an_id_replaces_the_document():
+    index = make_index({"a": "old text"})
+    index.add("a", "new text")
+
+    assert len(index) == 1
+    assert index.search("old") == []
+    assert [id_ for id_, _, _ in index.search("new")] == ["a"]
+
+
+def test_removed_documents_are_not_returned_or_counted():
+    index = make_index({str(i): "common word" for i in range(10)})
+    index.remove("0")
+    index.remove("1")
+
+    assert index.deleted == 2  # below the compaction ratio, so slots are tombstoned
+    ids = {id_ for id_, _, _ in index.search("common", top_k=20)}
+    assert ids == {str(i) for i in range(2, 10)}
+    assert index.count_covering("common word") == 8
+
+
+def test_idf_ignores_tombstoned_postings():
+    # "common" is in every live document but also in two deleted ones
+    index = make_index({str(i): "common" for i in range(9)})
+    index.add("rare", "common rare")
+    index.remove("0")
+    index.remove("1")
+    assert index.deleted == 2
+
+    scores = [score for _, score, _ in index.search("common", top_k=20)]
+
+    assert len(scores) == 8
+    assert min(scores) > 0
+
+
+def test_compaction_renumbers_slots_and_keeps_scores():
+    docs = {str(i): f"doc {i} shared" for i in range(8)}
+    index = make_index(docs)
+    fresh = make_index({id_: text for id_, text in docs.items() if id_ not in {"0", "1", "2"}})
+    for id_ in ("0", "1", "2"):
+        index.remove(id_)
+
+    assert index.deleted == 0  # 3 of 8 passed the compaction ratio
+    assert index.ids == ["3", "4", "5", "6", "7"]
+    assert index.search("shared 5", top_k=5) == pytest.approx(fresh.search("shared 5", top_k=5))
+
+
+def test_save_and_load_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(lexical_index._files, "directory", str(tmp_path))
+    index = make_index({"a": "alpha beta", "b": "beta gamma", "c": "gamma"})
+    index.remove("c")
+    index.save("docs")
+
+    loaded = BM25Index.load("docs")
+
+    assert loaded.ids == ["a", "b"]
+    assert loaded.search("beta gamma", top_k=5) == index.search("beta gamma", top_k=5)
+    assert BM25Index.load("missing") is None
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    assert reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "a"]], top_k=2) == ["b", "a"]
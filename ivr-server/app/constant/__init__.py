@@ -1,3 +1,5 @@
+import os
+
 NGROK_URL = "318b-103-213-211-149.ngrok-free.app"
 FLASK_URL = "http://192.168.142.213:5000"
 
@@ -8,3 +10,35 @@ MODEL_MAP = {
 }
 
 LANG_MAP = {"english": "en", "hindi": "hi", "kannada": "kn"}
+
+# Flask backend client
+BACKEND_TIMEOUTS = {  # seconds, per endpoint
+    "/language/set-language": 5,
+    "/nearby-schools/ask": 60,
+    "/ncert-questions/ask": 60,
+    "/scholarships/ask": 60,
+}
+BACKEND_DEFAULT_TIMEOUT = 30
+BACKEND_MAX_CONCURRENCY = int(os.getenv("BACKEND_MAX_CONCURRENCY", "32"))
+BACKEND_FAILURE_THRESHOLD = int(os.getenv("BACKEND_FAILURE_THRESHOLD", "5"))  # failures before the circuit opens
+BACKEND_RESET_TIMEOUT = float(os.getenv("BACKEND_RESET_TIMEOUT", "30"))  # seconds before a trial request
+
+WHISPER_LANGUAGES = {"en": "english", "hi": "hindi", "kn": "kannada"}
+
+# ASR engine tuning
+ASR_DEVICE = os.getenv("ASR_DEVICE", "cpu")
+ASR_WORKERS = int(os.getenv("ASR_WORKERS", "2"))  # concurrent inference jobs
+ASR_TORCH_THREADS = int(os.getenv("ASR_TORCH_THREADS", "4"))  # intra-op threads per job
+ASR_MAX_LOADED_MODELS = int(os.getenv("ASR_MAX_LOADED_MODELS", "3"))
+ASR_BATCH_WINDOW_MS = float(os.getenv("ASR_BATCH_WINDOW_MS", "30"))  # how long to gather utterances
+ASR_MAX_BATCH = int(os.getenv("ASR_MAX_BATCH", "8"))
+ASR_PRELOAD = [
+    lang for lang in os.getenv("ASR_PRELOAD", "en,hi,kn").split(",") if lang in MODEL_MAP
+]
+
+
+# Service turn polling
+HOLD_MUSIC_PATH = os.getenv("HOLD_MUSIC_PATH", "../backend/static/audio/waiting_music.mp3")
+HOLD_MUSIC_SEGMENT_SECONDS = float(os.getenv("HOLD_MUSIC_SEGMENT_SECONDS", "2"))  # poll interval
+SERVICE_FAST_PATH_SECONDS = float(os.getenv("SERVICE_FAST_PATH_SECONDS", "1.5"))  # answer inline if ready by then
+SERVICE_MAX_POLLS = int(os.getenv("SERVICE_MAX_POLLS", "60"))
@@ -1 +1,7 @@
-from app.helpers.transcribe import transcribe_audio_bytes
\ No newline at end of file
+from app.helpers.transcribe import transcribe_audio_bytes, transcribe_audio, model_pool, asr_metrics
+from app.helpers.prompts import say_prompt, restart_at_language_menu
+from app.helpers.recordings import fetch_recording, close_recording_client
+from app.helpers.sessions import get_call_session, update_call_session, end_call_session
+from app.helpers.audio_store import audio_store
+from app.helpers.backend_client import post_backend, open_backend_stream, close_backend_client, backend_client_stats, BackendUnavailable
+from app.helpers.hold_music import hold_music_segment
\ No newline at end of file
@@ -0,0 +1,82 @@
+import struct
+import numpy as np
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_MULAW = 7
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _mulaw_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.uint8)
+    sign = codes & 0x80
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = ((mantissa.astype(np.int32) << 3) + 0x84) << exponent
+    samples = np.where(sign != 0, 0x84 - magnitude, magnitude - 0x84)
+    return (samples / 32768.0).astype(np.float32)
+
+
+MULAW_TABLE = _mulaw_table()
+
+
+def _find_chunks(audio_bytes: bytes) -> dict:
+    if len(audio_bytes) < 12 or audio_bytes[:4] != b"RIFF" or audio_bytes[8:12] != b"WAVE":
+        raise ValueError("Recording is not a RIFF/WAVE file")
+
+    chunks = {}
+    offset = 12
+    while offset + 8 <= len(audio_bytes):
+        chunk_id, size = struct.unpack_from("<4sI", audio_bytes, offset)
+        start = offset + 8
+        # Streamed WAVs may carry a placeholder size on the data chunk
+        size = min(size, len(audio_bytes) - start)
+        chunks[chunk_id] = (start, size)
+        offset = start + size + (size & 1)
+    return chunks
+
+
+def decode_wav(audio_bytes: bytes) -> tuple[np.ndarray, int]:
+    """Decode a WAV recording held in memory into mono float32 samples.
+
+    The PCM payload is viewed in place with np.frombuffer; the only copy is
+    the conversion to float32 the ASR model needs.
+    """
+    chunks = _find_chunks(audio_bytes)
+    if b"fmt " not in chunks or b"data" not in chunks:
+        raise ValueError("WAV recording is missing its fmt or data chunk")
+
+    fmt_start, _ = chunks[b"fmt "]
+    audio_format, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", audio_bytes, fmt_start)
+    if audio_format == WAVE_FORMAT_EXTENSIBLE:
+        audio_format = struct.unpack_from("<H", audio_bytes, fmt_start + 24)[0]
+
+    data_start, data_size = chunks[b"data"]
+    frame_bytes = channels * max(bits // 8, 1)
+    count = (data_size // frame_bytes) * channels
+
+    if audio_format == WAVE_FORMAT_PCM and bits == 16:
+        pcm = np.frombuffer(audio_bytes, dtype="<i2", count=count, offset=data_start)
+        samples = pcm.astype(np.float32) / 32768.0
+    elif audio_format == WAVE_FORMAT_PCM and bits == 8:
+        pcm = np.frombuffer(audio_bytes, dtype=np.uint8, count=count, offset=data_start)
+        samples = (pcm.astype(np.float32) - 128.0) / 128.0
+    elif audio_format == WAVE_FORMAT_MULAW and bits == 8:
+        pcm = np.frombuffer(audio_bytes, dtype=np.uint8, count=count, offset=data_start)
+        samples = MULAW_TABLE[pcm]
+    else:
+        raise ValueError(f"Unsupported WAV encoding (format={audio_format}, bits={bits})")
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+
+    return samples, sample_rate
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    """Linear-interpolation resampler; enough for lifting 8 kHz telephony audio to 16 kHz."""
+    if sample_rate == target_rate or samples.size == 0:
+        return samples
+    duration = samples.size / sample_rate
+    target_size = int(round(duration * target_rate))
+    positions = np.linspace(0, samples.size - 1, num=target_size, dtype=np.float64)
+    return np.interp(positions, np.arange(samples.size), samples).astype(np.float32)
@@ -0,0 +1,125 @@
+import os
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+
+AUDIO_STORE_MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_BYTES", str(64 * 1024 * 1024)))
+AUDIO_STORE_TTL = int(os.getenv("AUDIO_STORE_TTL", "900"))  # seconds a turn's audio is kept
+AUDIO_SPILL_DIR = os.getenv("AUDIO_SPILL_DIR", os.path.join(tempfile.gettempdir(), "ivr-audio"))
+
+
+class AudioEntry:
+    __slots__ = ("audio", "path", "size", "source", "expires_at")
+
+    def __init__(self, expires_at: float, audio: bytes | None = None, source: str | None = None):
+        self.audio = audio
+        self.path = None
+        self.size = len(audio) if audio else 0
+        self.source = source  # backend stream path, until the audio has been relayed once
+        self.expires_at = expires_at
+
+
+class AudioStore:
+    """Per-call, per-turn audio held in memory, spilling the oldest blobs to disk past the cap.
+
+    This is a per-worker cache: the call session holds each turn's audio
+    reference, so a worker that misses here can still serve or relay it.
+    """
+
+    def __init__(self, max_bytes: int = AUDIO_STORE_MAX_BYTES, ttl: int = AUDIO_STORE_TTL,
+                 spill_dir: str = AUDIO_SPILL_DIR):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def _spill_path(self, key) -> str:
+        call_sid, turn = key
+        safe_sid = "".join(c for c in call_sid if c.isalnum())
+        return os.path.join(self.spill_dir, f"{safe_sid}-{turn}.mp3")
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if not entry:
+            return
+        if entry.audio is not None:
+            self._memory_bytes -= entry.size
+        if entry.path:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _evict_expired(self, now: float):
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            self._drop(key)
+
+    def _spill(self):
+        for key, entry in self._entries.items():
+            if self._memory_bytes <= self.max_bytes:
+                break
+            if entry.audio is None:
+                continue
+            try:
+                os.makedirs(self.spill_dir, exist_ok=True)
+                path = self._spill_path(key)
+                with open(path, "wb") as f:
+                    f.write(entry.audio)
+            except OSError as e:
+                print(f"⚠️ Could not spill audio to disk: {e}")
+                return
+            entry.path = path
+            entry.audio = None
+            self._memory_bytes -= entry.size
+
+    def put(self, call_sid: str, turn: int, audio: bytes):
+        key = (call_sid, turn)
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            self._drop(key)
+            self._entries[key] = AudioEntry(now + self.ttl, audio=audio)
+            self._memory_bytes += len(audio)
+            self._spill()
+
+    def put_stream(self, call_sid: str, turn: int, source: str):
+        key = (call_sid, turn)
+        with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            self._drop(key)
+            self._entries[key] = AudioEntry(now + self.ttl, source=source)
+
+    def get(self, call_sid: str, turn: int):
+        """Return (audio bytes, None), (None, stream source) or (None, None) when unknown."""
+        with self._lock:
+            self._evict_expired(time.monotonic())
+            entry = self._entries.get((call_sid, turn))
+            if not entry:
+                return None, None
+            if entry.audio is not None:
+                return entry.audio, None
+            path, source = entry.path, entry.source
+
+        if path:
+            try:
+                with open(path, "rb") as f:
+                    return f.read(), None
+            except OSError:
+                return None, None
+        return None, source
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_bytes": self.max_bytes,
+                "spilled": sum(1 for e in self._entries.values() if e.path),
+            }
+
+
+audio_store = AudioStore()
@@ -0,0 +1,199 @@
+import time
+import asyncio
+import httpx
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from http.cookies import SimpleCookie
+from app.constant import (
+    FLASK_URL,
+    BACKEND_TIMEOUTS,
+    BACKEND_DEFAULT_TIMEOUT,
+    BACKEND_MAX_CONCURRENCY,
+    BACKEND_FAILURE_THRESHOLD,
+    BACKEND_RESET_TIMEOUT,
+)
+
+
+class BackendUnavailable(Exception):
+    """The backend is failing, too slow, or the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = BACKEND_FAILURE_THRESHOLD,
+                 reset_timeout: float = BACKEND_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.trial_in_flight:
+            # Let a single request through to probe whether the backend recovered
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            print(f"🚧 Backend circuit opened after {self.failures} failures")
+
+    def release_trial(self):
+        """The trial request ended without a verdict (e.g. cancelled): let the next one probe."""
+        self.trial_in_flight = False
+
+
+breaker = CircuitBreaker()
+_client = None
+_limit = None
+
+
+def get_backend_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=FLASK_URL,
+            limits=httpx.Limits(
+                max_connections=BACKEND_MAX_CONCURRENCY,
+                max_keepalive_connections=BACKEND_MAX_CONCURRENCY,
+            ),
+            timeout=httpx.Timeout(BACKEND_DEFAULT_TIMEOUT),
+            # Shared by every call: the backend's session cookie belongs to one CallSid,
+            # so the client keeps none and callers pass their own with each request
+            cookies=CookieJar(policy=DefaultCookiePolicy(allowed_domains=[])),
+        )
+    return _client
+
+
+def _get_limit() -> asyncio.Semaphore:
+    global _limit
+    if _limit is None:
+        _limit = asyncio.Semaphore(BACKEND_MAX_CONCURRENCY)
+    return _limit
+
+
+async def close_backend_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _timeout_for(path: str) -> float:
+    return BACKEND_TIMEOUTS.get(path, BACKEND_DEFAULT_TIMEOUT)
+
+
+def _cookie_headers(cookies: dict | None) -> dict:
+    if not cookies:
+        return {}
+    return {"Cookie": "; ".join(f"{name}={value}" for name, value in cookies.items())}
+
+
+def _merge_cookies(cookies: dict | None, response: httpx.Response):
+    """Apply the response's Set-Cookie headers to the caller's cookie dict."""
+    if cookies is None:
+        return
+    for header in response.headers.get_list("set-cookie"):
+        parsed = SimpleCookie()
+        try:
+            parsed.load(header)
+        except Exception:
+            continue
+        for name, morsel in parsed.items():
+            if not morsel.value or morsel["max-age"] == "0":
+                cookies.pop(name, None)
+            else:
+                cookies[name] = morsel.value
+
+
+def _admit(path: str) -> bool:
+    """Raise if the circuit is open; True when this request is the half-open trial."""
+    if not path.strip("/"):
+        raise BackendUnavailable("No backend endpoint for this request")
+    if not breaker.allow():
+        raise BackendUnavailable(f"Circuit open, skipping {path}")
+    # Only one request is admitted while half-open, and nothing awaits since allow()
+    return breaker.trial_in_flight
+
+
+async def post_backend(path: str, payload: dict, cookies: dict | None = None) -> dict:
+    """POST JSON to the backend; `cookies` is the call's backend cookie dict, updated in place."""
+    trial = _admit(path)
+    try:
+        try:
+            async with _get_limit():
+                response = await get_backend_client().post(
+                    path, json=payload, headers=_cookie_headers(cookies), timeout=_timeout_for(path)
+                )
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            raise BackendUnavailable(str(e) or type(e).__name__) from e
+        except httpx.HTTPError as e:
+            raise BackendUnavailable(str(e) or type(e).__name__) from e
+
+        # Only an unreachable or erroring backend counts against the circuit;
+        # a 4xx answer means it is up and rejected this one request
+        if response.status_code >= 500:
+            breaker.record_failure()
+            raise BackendUnavailable(f"{path} returned {response.status_code}")
+        breaker.record_success()
+        _merge_cookies(cookies, response)
+
+        try:
+            return response.json()
+        except ValueError as e:
+            raise BackendUnavailable(f"{path} returned {response.status_code} without a JSON body") from e
+    finally:
+        if trial:
+            breaker.release_trial()
+
+
+async def open_backend_stream(path: str, cookies: dict | None = None) -> httpx.Response:
+    """Start a streamed GET; the caller must `aclose()` the returned response."""
+    trial = _admit(path)
+    try:
+        client = get_backend_client()
+        try:
+            request = client.build_request("GET", path, headers=_cookie_headers(cookies), timeout=_timeout_for(path))
+            response = await client.send(request, stream=True)
+        except httpx.TransportError as e:
+            breaker.record_failure()
+            raise BackendUnavailable(str(e) or type(e).__name__) from e
+        except httpx.HTTPError as e:
+            raise BackendUnavailable(str(e) or type(e).__name__) from e
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            _merge_cookies(cookies, response)
+        return response
+    finally:
+        if trial:
+            breaker.release_trial()
+
+
+def backend_client_stats() -> dict:
+    return {
+        "circuit": breaker.state,
+        "consecutive_failures": breaker.failures,
+        "max_concurrency": BACKEND_MAX_CONCURRENCY,
+    }
@@ -0,0 +1,78 @@
+from app.constant import HOLD_MUSIC_PATH, HOLD_MUSIC_SEGMENT_SECONDS
+
+# MPEG audio header tables (Layer III only)
+MPEG1_BITRATES = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0]
+MPEG2_BITRATES = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0]
+SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+_segments = None
+
+
+def _skip_id3(data: bytes) -> int:
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return 10 + size
+
+
+def _frames(data: bytes):
+    """Yield (offset, length, seconds) for each Layer III frame."""
+    offset = _skip_id3(data)
+    while offset + 4 <= len(data):
+        b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+        version = (b1 >> 3) & 0x03
+        layer = (b1 >> 1) & 0x03
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 0x03
+
+        if (data[offset] != 0xFF or (b1 & 0xE0) != 0xE0 or version == 1 or layer != 1
+                or bitrate_index in (0, 15) or rate_index == 3):
+            offset += 1  # not a frame header, resync
+            continue
+
+        sample_rate = SAMPLE_RATES[version][rate_index]
+        padding = (b2 >> 1) & 0x01
+        if version == 3:
+            bitrate = MPEG1_BITRATES[bitrate_index] * 1000
+            samples = 1152
+        else:
+            bitrate = MPEG2_BITRATES[bitrate_index] * 1000
+            samples = 576
+        length = samples // 8 * bitrate // sample_rate + padding
+
+        yield offset, length, samples / sample_rate
+        offset += length
+
+
+def _load_segments() -> list:
+    global _segments
+    if _segments is not None:
+        return _segments
+
+    _segments = []
+    try:
+        with open(HOLD_MUSIC_PATH, "rb") as f:
+            data = f.read()
+    except OSError:
+        print(f"⚠️ Hold music not found at {HOLD_MUSIC_PATH}, callers will hear silence.")
+        return _segments
+
+    start, duration = None, 0.0
+    for offset, length, seconds in _frames(data):
+        if start is None:
+            start = offset
+        duration += seconds
+        if duration >= HOLD_MUSIC_SEGMENT_SECONDS:
+            _segments.append(data[start:offset + length])
+            start, duration = None, 0.0
+
+    print(f"🎵 Hold music split into {len(_segments)} segments of ~{HOLD_MUSIC_SEGMENT_SECONDS}s")
+    return _segments
+
+
+def hold_music_segment(index: int) -> bytes | None:
+    """Frame-aligned slice of the hold music; indices wrap so the music keeps looping."""
+    segments = _load_segments()
+    if not segments:
+        return None
+    return segments[index % len(segments)]
@@ -0,0 +1,40 @@
+import os
+import json
+from twilio.twiml.voice_response import VoiceResponse
+
+# Written by backend/helpers/audio_samples_generator.py at deploy time
+PROMPT_DIR = os.path.join("static", "prompts")
+MANIFEST_PATH = os.path.join(PROMPT_DIR, "manifest.json")
+
+_prompt_files = None
+
+
+def _load_prompt_files() -> dict:
+    global _prompt_files
+    if _prompt_files is None:
+        _prompt_files = {}
+        try:
+            with open(MANIFEST_PATH, encoding="utf-8") as f:
+                manifest = json.load(f)
+            for entry in manifest.get("prompts", []):
+                _prompt_files.setdefault(entry["text"], entry["file"])
+        except (OSError, json.JSONDecodeError):
+            print(f"⚠️ No prompt manifest at {MANIFEST_PATH}, falling back to <Say>.")
+    return _prompt_files
+
+
+def say_prompt(response: VoiceResponse, text: str, base_url) -> VoiceResponse:
+    """Play the pre-rendered recording of `text` if there is one, else <Say> it."""
+    file_name = _load_prompt_files().get(text)
+    if file_name:
+        response.play(f"{base_url}static/prompts/{file_name}")
+    else:
+        response.say(text)
+    return response
+
+
+def restart_at_language_menu(response: VoiceResponse, base_url) -> VoiceResponse:
+    """The call's session expired or was never stored: start over at language selection."""
+    say_prompt(response, "Sorry, your session has expired. Let us start again.", base_url)
+    response.redirect("/call/incoming", method="POST")
+    return response
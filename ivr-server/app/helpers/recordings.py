@@ -0,0 +1,52 @@
+import os
+import asyncio
+import httpx
+
+RECORDING_FETCH_TIMEOUT = float(os.getenv("RECORDING_FETCH_TIMEOUT", "10"))  # total readiness budget
+RECORDING_POLL_INITIAL = 0.2
+RECORDING_POLL_MAX = 1.0
+
+_client = None
+
+
+def get_recording_client() -> httpx.AsyncClient:
+    # Shared across calls so Twilio connections stay pooled and warm
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            auth=(os.getenv("TWILIO_ACCOUNT_SID") or "", os.getenv("TWILIO_AUTH_TOKEN") or ""),
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            timeout=httpx.Timeout(10.0),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_recording_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_recording(url: str, client: httpx.AsyncClient | None = None) -> bytes:
+    """Download a Twilio recording, polling with backoff until it is available."""
+    client = client or get_recording_client()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + RECORDING_FETCH_TIMEOUT
+    delay = RECORDING_POLL_INITIAL
+
+    while True:
+        try:
+            response = await client.get(url)
+            if response.status_code == 200 and response.content:
+                return response.content
+            print(f"⏳ Recording not ready yet (status {response.status_code})")
+        except httpx.TransportError as e:
+            print(f"⏳ Recording fetch failed: {e}")
+
+        if loop.time() + delay > deadline:
+            raise TimeoutError(f"Recording not available after {RECORDING_FETCH_TIMEOUT}s: {url}")
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, RECORDING_POLL_MAX)
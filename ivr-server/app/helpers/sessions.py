@@ -0,0 +1,102 @@
+import os
+import json
+import time
+import asyncio
+
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # "memory" or "redis"
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))  # seconds a call's state survives
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class InMemorySessionBackend:
+    """Per-process store with TTL eviction; fine for a single uvicorn worker."""
+
+    def __init__(self, ttl: int = SESSION_TTL):
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = asyncio.Lock()
+
+    def _evict_expired(self, now: float):
+        expired = [sid for sid, (expires_at, _) in self._sessions.items() if expires_at <= now]
+        for sid in expired:
+            del self._sessions[sid]
+
+    async def get(self, call_sid: str) -> dict:
+        async with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            entry = self._sessions.get(call_sid)
+            return dict(entry[1]) if entry else {}
+
+    async def update(self, call_sid: str, fields: dict) -> dict:
+        async with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            data = dict(self._sessions.get(call_sid, (0, {}))[1])
+            data.update(fields)
+            self._sessions[call_sid] = (now + self.ttl, data)
+            return dict(data)
+
+    async def delete(self, call_sid: str):
+        async with self._lock:
+            self._sessions.pop(call_sid, None)
+
+
+class RedisSessionBackend:
+    """Shared store so any worker or node can serve any turn of a call."""
+
+    def __init__(self, url: str = REDIS_URL, ttl: int = SESSION_TTL):
+        import redis.asyncio as redis
+        from redis.exceptions import WatchError
+
+        self.ttl = ttl
+        self._watch_error = WatchError
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    @staticmethod
+    def _key(call_sid: str) -> str:
+        return f"ivr:call:{call_sid}"
+
+    async def get(self, call_sid: str) -> dict:
+        raw = await self._redis.get(self._key(call_sid))
+        return json.loads(raw) if raw else {}
+
+    async def update(self, call_sid: str, fields: dict) -> dict:
+        key = self._key(call_sid)
+        async with self._redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    raw = await pipe.get(key)
+                    data = json.loads(raw) if raw else {}
+                    data.update(fields)
+                    pipe.multi()
+                    pipe.set(key, json.dumps(data), ex=self.ttl)
+                    await pipe.execute()
+                    return data
+                except self._watch_error:
+                    # Another worker touched this call concurrently; retry on fresh data
+                    continue
+
+    async def delete(self, call_sid: str):
+        await self._redis.delete(self._key(call_sid))
+
+
+SESSION_BACKENDS = {
+    "memory": InMemorySessionBackend,
+    "redis": RedisSessionBackend,
+}
+
+session_store = SESSION_BACKENDS[SESSION_BACKEND]()
+
+
+async def get_call_session(call_sid: str) -> dict:
+    return await session_store.get(call_sid)
+
+
+async def update_call_session(call_sid: str, **fields) -> dict:
+    return await session_store.update(call_sid, fields)
+
+
+async def end_call_session(call_sid: str):
+    await session_store.delete(call_sid)
@@ -1,29 +1,218 @@
-import os
-from transformers.pipelines import pipeline
-from app.constant import MODEL_MAP
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import speech_recognition as sr
+import torch
+from transformers.pipelines import pipeline
+from app.helpers.audio import decode_wav, resample
+from app.constant import (
+    MODEL_MAP,
+    WHISPER_LANGUAGES,
+    ASR_DEVICE,
+    ASR_WORKERS,
+    ASR_TORCH_THREADS,
+    ASR_MAX_LOADED_MODELS,
+    ASR_BATCH_WINDOW_MS,
+    ASR_MAX_BATCH,
+)
 
-def transcribe_audio_bytes(audio_bytes: bytes, language: str) -> str:
+torch.set_num_threads(ASR_TORCH_THREADS)
+
+# Inference runs here so the event loop never blocks on the CPU
+asr_executor = ThreadPoolExecutor(max_workers=ASR_WORKERS, thread_name_prefix="asr")
+
+
+class ModelPool:
+    """Keeps Whisper pipelines warm, evicting the least recently used past `max_loaded`."""
+
+    def __init__(self, max_loaded: int = ASR_MAX_LOADED_MODELS):
+        self.max_loaded = max(1, max_loaded)
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {language: threading.Lock() for language in MODEL_MAP}
+
+    def get(self, language: str):
+        with self._lock:
+            if language in self._models:
+                self._models.move_to_end(language)
+                return self._models[language]
+
+        # One loader per language; other languages keep serving meanwhile
+        with self._load_locks[language]:
+            with self._lock:
+                if language in self._models:
+                    return self._models[language]
+
+            print(f"🧠 Loading model {MODEL_MAP[language]} for language {language}")
+            started = time.perf_counter()
+            model = pipeline(
+                "automatic-speech-recognition",
+                model=MODEL_MAP[language],
+                device=ASR_DEVICE,
+            )
+            print(f"✅ Loaded {MODEL_MAP[language]} in {time.perf_counter() - started:.1f}s")
+
+            with self._lock:
+                self._models[language] = model
+                while len(self._models) > self.max_loaded:
+                    evicted, _ = self._models.popitem(last=False)
+                    print(f"♻️ Unloaded model for language {evicted}")
+            return model
+
+    def preload(self, languages):
+        for language in languages:
+            self.get(language)
+
+    def loaded(self):
+        with self._lock:
+            return list(self._models)
+
+
+model_pool = ModelPool()
+
+
+# -----------------------------
+# Latency metrics
+# -----------------------------
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+
+def _record_latency(language: str, seconds: float, ok: bool):
+    with _metrics_lock:
+        entry = _metrics.setdefault(
+            language, {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+        )
+        ms = seconds * 1000
+        entry["count"] += 1
+        entry["errors"] += 0 if ok else 1
+        entry["total_ms"] += ms
+        entry["max_ms"] = max(entry["max_ms"], ms)
+        entry["last_ms"] = ms
+
+
+def asr_metrics() -> dict:
+    with _metrics_lock:
+        languages = {
+            language: {
+                **entry,
+                "mean_ms": round(entry["total_ms"] / entry["count"], 1) if entry["count"] else 0.0,
+            }
+            for language, entry in _metrics.items()
+        }
+    return {"loaded_models": model_pool.loaded(), "languages": languages}
+
+
+# -----------------------------
+# Transcription
+# -----------------------------
+def transcribe_batch(batch: list, language: str) -> list:
+    """Transcribe [(samples, sample_rate), ...] for one language as a single padded batch."""
     if language not in MODEL_MAP:
         raise ValueError(
             f"Unsupported language '{language}'. Choose from: {list(MODEL_MAP.keys())}"
         )
 
-    print(f"🧠 Using model {MODEL_MAP[language]} for language {language}")
+    print(f"🧠 Using model {MODEL_MAP[language]} for language {language} (batch of {len(batch)})")
+
+    started = time.perf_counter()
+    ok = False
+    try:
+        asr = model_pool.get(language)
+        target_rate = asr.feature_extractor.sampling_rate
+        inputs = [
+            {"raw": resample(samples, sample_rate, target_rate), "sampling_rate": target_rate}
+            for samples, sample_rate in batch
+        ]
+        results = asr(
+            inputs,
+            batch_size=len(inputs),
+            generate_kwargs={"language": WHISPER_LANGUAGES[language], "task": "transcribe"},
+        )
+        prompts = [result["text"].strip() for result in results]
+        ok = True
+    finally:
+        elapsed = time.perf_counter() - started
+        for _ in batch:
+            _record_latency(language, elapsed, ok)
+
+    for prompt in prompts:
+        print("[USER:]", prompt)
+
+    return prompts
+
+
+def transcribe_samples(samples: np.ndarray, sample_rate: int, language: str) -> str:
+    return transcribe_batch([(samples, sample_rate)], language)[0]
+
+
+def transcribe_audio_bytes(audio_bytes: bytes, language: str) -> str:
+    # Each call decodes its own buffer, so overlapping calls share nothing on disk
+    samples, sample_rate = decode_wav(audio_bytes)
+    return transcribe_samples(samples, sample_rate, language)
+
+
+# -----------------------------
+# Micro-batching across callers
+# -----------------------------
+class TranscriptionBatcher:
+    """Gathers utterances for a few milliseconds and runs one batch per language model."""
+
+    def __init__(self, window_ms: float = ASR_BATCH_WINDOW_MS, max_batch: int = ASR_MAX_BATCH):
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+        self._pending = {}
+        self._timers = {}
+
+    async def transcribe(self, audio_bytes: bytes, language: str) -> str:
+        if language not in MODEL_MAP:
+            raise ValueError(
+                f"Unsupported language '{language}'. Choose from: {list(MODEL_MAP.keys())}"
+            )
+
+        samples, sample_rate = decode_wav(audio_bytes)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        pending = self._pending.setdefault(language, [])
+        pending.append((samples, sample_rate, future))
+
+        if len(pending) >= self.max_batch:
+            self._flush(language)
+        elif language not in self._timers:
+            self._timers[language] = loop.call_later(self.window, self._flush, language)
+
+        return await future
+
+    def _flush(self, language: str):
+        timer = self._timers.pop(language, None)
+        if timer:
+            timer.cancel()
+        pending = self._pending.pop(language, [])
+        if not pending:
+            return
+
+        loop = asyncio.get_running_loop()
+        batch = [(samples, sample_rate) for samples, sample_rate, _ in pending]
+        job = loop.run_in_executor(asr_executor, transcribe_batch, batch, language)
 
-    audio_filename = "temp_audio.wav"
-    with open(audio_filename, "wb") as f:
-        f.write(audio_bytes)
+        def fan_out(done):
+            error = done.exception()
+            for index, (_, _, future) in enumerate(pending):
+                if future.done():
+                    continue
+                if error:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[index])
 
-    r = sr.Recognizer()
-    with sr.AudioFile(audio_filename) as source:
-        audio_data = r.record(source)
+        job.add_done_callback(fan_out)
 
-    prompt = r.recognize_google(audio_data, language=f"en-IN")
 
-    print("[USER:]", prompt)
+batcher = TranscriptionBatcher()
 
-    os.remove(audio_filename)
 
-    return prompt
\ No newline at end of file
+async def transcribe_audio(audio_bytes: bytes, language: str) -> str:
+    return await batcher.transcribe(audio_bytes, language)
@@ -1,13 +1,32 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from app.routes import call_router, service_router, option_router
+import asyncio
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
-app = FastAPI()
+
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from app.routes import call_router, service_router, option_router, metrics_router, audio_router
+from app.constant import ASR_PRELOAD
+from app.helpers import model_pool, close_recording_client, close_backend_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the Whisper pipelines before the first caller speaks
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, model_pool.preload, ASR_PRELOAD)
+    yield
+    await close_recording_client()
+    await close_backend_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.mount("/static", StaticFiles(directory="static"), name="static")
 app.state.audio_bytes = bytes()
 app.include_router(call_router)
 app.include_router(service_router)
 app.include_router(option_router)
+app.include_router(metrics_router)
+app.include_router(audio_router)
\ No newline at end of file
@@ -1,3 +1,5 @@
 from app.routes.calls import call_router
 from app.routes.options import option_router
-from app.routes.services import service_router
\ No newline at end of file
+from app.routes.services import service_router
+from app.routes.metrics import metrics_router
+from app.routes.audio import audio_router
\ No newline at end of file
@@ -0,0 +1,90 @@
+import re
+import base64
+from fastapi import APIRouter, Request, Response
+from fastapi.responses import StreamingResponse
+from app.helpers import audio_store, get_call_session, open_backend_stream, BackendUnavailable
+
+audio_router = APIRouter(prefix="/audio")
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+def _ranged_response(audio: bytes, range_header: str | None) -> Response:
+    total = len(audio)
+    headers = {"Accept-Ranges": "bytes", "Cache-Control": "no-store"}
+
+    match = RANGE_PATTERN.match(range_header.strip()) if range_header else None
+    if not match or not any(match.groups()):
+        headers["Content-Length"] = str(total)
+        return Response(content=audio, media_type="audio/mpeg", headers=headers)
+
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), total - 1) if end else total - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(total - int(end), 0)
+        end = total - 1
+
+    if start >= total or start > end:
+        headers["Content-Range"] = f"bytes */{total}"
+        return Response(status_code=416, headers=headers)
+
+    headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+    headers["Content-Length"] = str(end - start + 1)
+    return Response(content=audio[start:end + 1], status_code=206, media_type="audio/mpeg", headers=headers)
+
+
+async def _relay_stream(call_sid: str, turn: int, source: str) -> Response:
+    session = await get_call_session(call_sid)
+    try:
+        upstream = await open_backend_stream(source, dict(session.get("backend_cookies") or {}))
+    except BackendUnavailable as e:
+        print(f"❌ Audio stream unavailable: {e}")
+        return Response(content="Audio not available.", status_code=503)
+
+    if upstream.status_code != 200:
+        await upstream.aclose()
+        return Response(content="Audio not available.", status_code=upstream.status_code)
+
+    async def relay():
+        received = []
+        try:
+            async for chunk in upstream.aiter_bytes():
+                if chunk:
+                    received.append(chunk)
+                    yield chunk
+            # Later fetches (retries, range requests) are served from memory
+            audio_store.put(call_sid, turn, b"".join(received))
+        finally:
+            await upstream.aclose()
+
+    return StreamingResponse(relay(), media_type="audio/mpeg", headers={"Cache-Control": "no-store"})
+
+
+async def _audio_from_session(call_sid: str, turn: int):
+    """The turn may have been answered on another worker; its audio reference is in the call session."""
+    session = await get_call_session(call_sid)
+    if session.get("audio_turn") != turn:
+        return None, None
+    if session.get("audio_inline"):
+        audio = base64.b64decode(session["audio_inline"])
+        audio_store.put(call_sid, turn, audio)
+        return audio, None
+    return None, session.get("audio_source")
+
+
+@audio_router.get("/{call_sid}/{turn}.mp3")
+async def get_audio(call_sid: str, turn: int, request: Request):
+    audio, source = audio_store.get(call_sid, turn)
+    if audio is None and not source:
+        audio, source = await _audio_from_session(call_sid, turn)
+
+    if audio is not None:
+        return _ranged_response(audio, request.headers.get("range"))
+    if source:
+        # Twilio starts playing while the backend is still synthesizing
+        return await _relay_stream(call_sid, turn, source)
+
+    return Response(content="Audio not found.", status_code=404)
@@ -1,24 +1,33 @@
 import os
 import wave
+import httpx
 from fastapi import APIRouter, Request, Response
-import requests
 from twilio.twiml.voice_response import VoiceResponse, Gather
 from app.constant import LANG_MAP
-from app.helpers import transcribe_audio_bytes
+from app.helpers import transcribe_audio, say_prompt, restart_at_language_menu, fetch_recording, get_call_session, update_call_session
 import numpy as np
 import audioop
 import noisereduce as nr
-from requests.auth import HTTPBasicAuth
-import time
 
 call_router = APIRouter()
 
-TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
-TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
+
+def _retry_recording_twiml(request: Request) -> VoiceResponse:
+    response = VoiceResponse()
+    say_prompt(response, "Sorry, we could not get your recording. Please try again.", request.base_url)
+    response.record(
+        action="/stream/start",
+        method="POST",
+        max_length=10,
+        timeout=10,
+        play_beep=True,
+    )
+    say_prompt(response, "We did not hear anything. Goodbye.", request.base_url)
+    return response
 
 
 @call_router.post("/call/incoming")
-def incoming_call():
+def incoming_call(request: Request):
     response = VoiceResponse()
     gather = Gather(
         num_digits=1,
@@ -27,12 +36,14 @@ def incoming_call():
         timeout=10,
     )
 
-    response.say(
-        "Thank you for calling SAAS. Press 1 for Kannada, 2 for Hindi and 3 for English"
+    say_prompt(
+        response,
+        "Thank you for calling SAAS. Press 1 for Kannada, 2 for Hindi and 3 for English",
+        request.base_url,
     )
     response.append(gather)
 
-    response.say("We didn't receive any input. Goodbye.")
+    say_prompt(response, "We didn't receive any input. Goodbye.", request.base_url)
     response.hangup()
 
     return Response(content=str(response), media_type="application/xml")
@@ -45,22 +56,29 @@ async def start_stream(
     form_data = await request.form()
     print(form_data.keys())
     url = form_data.get("RecordingUrl")
+    call_sid = form_data.get("CallSid")
     wav_url = f"{url}.wav"
     print(wav_url)
 
-    time.sleep(3)
-    response = requests.get(
-        wav_url, auth=HTTPBasicAuth(TWILIO_ACCOUNT_SID or "", TWILIO_AUTH_TOKEN or "")
-    )
-
-    print(f"\n\n\nRESPONSE CODE: {response.status_code}\n\n\n")
-    recording_bytes = response.content  # The raw bytes of the audio file
-
-    language = request.app.state.language
-
-    prompt = transcribe_audio_bytes(recording_bytes, LANG_MAP[language])
-
-    request.app.state.prompt = prompt
+    session = await get_call_session(call_sid)
+    language = session.get("language")
+    if language not in LANG_MAP:
+        response = restart_at_language_menu(VoiceResponse(), request.base_url)
+        return Response(content=str(response), media_type="application/xml")
+
+    # Polls until Twilio has the recording ready, without blocking other callers
+    try:
+        recording_bytes = await fetch_recording(wav_url)
+    except (TimeoutError, httpx.HTTPError) as e:
+        print(f"❌ Could not fetch the recording: {e}")
+        return Response(content=str(_retry_recording_twiml(request)), media_type="application/xml")
+
+    prompt = await transcribe_audio(recording_bytes, LANG_MAP[language])
+    if not (prompt or "").strip():
+        # Silence or noise only: ask again instead of sending an empty question
+        return Response(content=str(_retry_recording_twiml(request)), media_type="application/xml")
+
+    await update_call_session(call_sid, prompt=prompt)
 
     response = VoiceResponse()
     response.redirect("/service")
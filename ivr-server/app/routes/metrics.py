@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+from app.helpers import asr_metrics, audio_store, backend_client_stats
+
+metrics_router = APIRouter(prefix="/metrics")
+
+
+@metrics_router.get("/asr")
+def get_asr_metrics():
+    return asr_metrics()
+
+
+@metrics_router.get("/audio-store")
+def get_audio_store_metrics():
+    return audio_store.stats()
+
+
+@metrics_router.get("/backend")
+def get_backend_metrics():
+    return backend_client_stats()
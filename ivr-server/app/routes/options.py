@@ -1,8 +1,7 @@
 from fastapi import APIRouter, Request, Response
-import requests
 from twilio.twiml.voice_response import VoiceResponse, Gather
 
-from app.constant import FLASK_URL
+from app.helpers import say_prompt, restart_at_language_menu, update_call_session, post_backend, BackendUnavailable
 
 
 option_router = APIRouter(prefix="/options")
@@ -15,21 +14,27 @@ async def handle_language_selection(request: Request):
     response = VoiceResponse()
 
     digit = form.get("Digits")
+    call_sid = form.get("CallSid")
 
     if digit not in ["1", "2", "3"]:
-        response.say("Invalid Input. Goodbye.")
+        say_prompt(response, "Invalid Input. Goodbye.", request.base_url)
         return Response(content=str(response), media_type="application/xml")
 
     lang_mapper = {"1": "kannada", "2": "hindi", "3": "english"}
 
     language = lang_mapper[digit]
 
-    request.app.state.language = language
-
-    url = f"{FLASK_URL}/language/set-language"
     data = {"language": language}
 
-    requests.post(url, json=data)
+    # The backend's Flask session cookie belongs to this call alone; it lives in the call session
+    backend_cookies = {}
+    try:
+        await post_backend("/language/set-language", data, backend_cookies)
+    except BackendUnavailable as e:
+        # The language also travels with every /ask request, so the call can go on
+        print(f"⚠️ Could not set backend language: {e}")
+
+    await update_call_session(call_sid, language=language, backend_cookies=backend_cookies)
 
     gather = Gather(
         num_digits=1,
@@ -44,7 +49,7 @@ async def handle_language_selection(request: Request):
 
     response.append(gather)
 
-    response.say("We didn't receive any input. Goodbye.")
+    say_prompt(response, "We didn't receive any input. Goodbye.", request.base_url)
     response.hangup()
 
     return Response(content=str(response), media_type="application/xml")
@@ -54,11 +59,12 @@ async def handle_language_selection(request: Request):
 async def handle_requirements_selection(request: Request):
     form = await request.form()
     digit = form.get("Digits")
+    call_sid = form.get("CallSid")
 
     response = VoiceResponse()
 
     if digit not in ["1", "2", "3", "4"]:
-        response.say("Invalid Input. Goodbye.")
+        say_prompt(response, "Invalid Input. Goodbye.", request.base_url)
         return Response(content=str(response), media_type="application/xml")
 
     route_mapper = {
@@ -68,9 +74,18 @@ async def handle_requirements_selection(request: Request):
         "4": "",
     }
 
-    request.app.state.endpoint = route_mapper[digit]
+    if not route_mapper[digit]:
+        # No voice service behind this option yet; never send it to the backend
+        say_prompt(response, "Sorry, this service is not available on the phone yet. Goodbye.", request.base_url)
+        response.hangup()
+        return Response(content=str(response), media_type="application/xml")
 
-    language = request.app.state.language
+    session = await update_call_session(call_sid, endpoint=route_mapper[digit])
+
+    language = session.get("language")
+    if not language:
+        restart_at_language_menu(response, request.base_url)
+        return Response(content=str(response), media_type="application/xml")
 
     response.play(str(request.base_url) + f'static/query_share_{language}.mp3')
 
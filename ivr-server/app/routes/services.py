@@ -1,71 +1,178 @@
 import os
-from fastapi import APIRouter, Request, Response
-import requests
-from app.constant import FLASK_URL
+import asyncio
 import base64
+from fastapi import APIRouter, Request, Response
 from twilio.twiml.voice_response import VoiceResponse
+from app.constant import SERVICE_FAST_PATH_SECONDS, SERVICE_MAX_POLLS
+from app.helpers import (
+    say_prompt,
+    restart_at_language_menu,
+    get_call_session,
+    update_call_session,
+    audio_store,
+    post_backend,
+    BackendUnavailable,
+    hold_music_segment,
+)
 
 service_router = APIRouter()
 
+# Tasks this worker is running, held only so they are not garbage-collected.
+# Job status and the finished audio reference live in the call session, so
+# /service/poll and /audio can land on any worker.
+_jobs = {}
 
-@service_router.post("/service")
-def get_service(request: Request):
-    try:
-        response = VoiceResponse()
-        response.pause(length=10)
-
-
-        print("🔍 Retrieving prompt and endpoint values from app state...")
-        prompt = request.app.state.prompt
-        endpoint = request.app.state.endpoint
 
-        url = f"{FLASK_URL}{endpoint}"
-        data = {"prompt": prompt}
-        print(f"🌐 Sending POST request to Flask service: {url} with data: {data}")
+def _xml(response: VoiceResponse) -> Response:
+    return Response(content=str(response), media_type="application/xml")
 
-        res = requests.post(
-            url, json=data, headers={"Content-Type": "application/json"}, timeout=120
-        ).json()
 
-        print("✅ Successfully received response from Flask service.", res)
+def _busy_twiml(request: Request) -> VoiceResponse:
+    response = VoiceResponse()
+    say_prompt(
+        response,
+        "Sorry, our service is busy right now. Please try again later.",
+        request.base_url,
+    )
+    response.hangup()
+    return response
 
-        audio_b64 = res.get("audio")
 
-        if not audio_b64:
-            print("❌ No audio data returned from Flask service.")
-            return Response(
-                content="No audio returned from the service.", status_code=500
-            )
+def _answer_twiml(request: Request, call_sid: str, turn: int, language: str) -> VoiceResponse:
+    response = VoiceResponse()
+    response.play(f"{request.base_url}audio/{call_sid}/{turn}.mp3")
 
-        print("🎶 Base64 audio received. Decoding and saving to file...")
+    print("🎤 Waiting for speech input from the user...")
+    response.play(str(request.base_url) + f"static/continue_convo_{language}.mp3")
 
-        audio_path = "static/tts.mp3"
-        with open(audio_path, "wb") as f:
-            f.write(base64.b64decode(audio_b64))
+    response.record(
+        action="/stream/start",
+        method="POST",
+        max_length=10,
+        timeout=10,
+        play_beep=True,
+    )
 
-        print(f"💾 Audio saved to {audio_path}.")
+    say_prompt(response, "We did not hear anything. Goodbye.", request.base_url)
+    return response
 
-        print("📞 Creating Twilio VoiceResponse...")
 
-        response = VoiceResponse()
-        response.play(f"{request.base_url}static/tts.mp3")
+def _hold_twiml(request: Request, turn: int, poll: int) -> VoiceResponse:
+    response = VoiceResponse()
+    if hold_music_segment(poll) is not None:
+        response.play(f"{request.base_url}hold-music/{poll}.mp3")
+    else:
+        response.pause(length=1)
+    response.redirect(f"/service/poll?turn={turn}&poll={poll + 1}")
+    return response
 
-        print("🎤 Waiting for speech input from the user...")
-        language = request.app.state.language
-        response.play(str(request.base_url) + f"static/continue_convo_{language}.mp3")
 
-        # os.remove("static/tts.mp3")
+async def _run_service_job(call_sid: str, turn: int, endpoint: str, data: dict, cookies: dict) -> str:
+    """Query the backend for one turn and park its audio in the store; returns the job status."""
+    updates = {"job_turn": turn, "job_status": "failed"}
+    try:
+        print(f"🌐 Sending POST request to Flask service: {endpoint} with data: {data}")
+        res = await post_backend(endpoint, data, cookies)
+        updates["backend_cookies"] = cookies
+        print("✅ Successfully received response from Flask service.", res)
 
-        response.record(
-            action="/stream/start",
-            method="POST",
-            max_length=10,
-            timeout=10,
-            play_beep=True,
+        audio = res.get("audio")
+        if not audio:
+            print("❌ No audio data returned from Flask service.")
+            return updates["job_status"]
+
+        # The session carries the audio reference so whichever worker Twilio's GET lands on
+        # can serve it; this worker's audio store only saves a session read on the common path
+        if audio.startswith("/tts/stream/"):
+            # Relayed on first fetch so Twilio hears it while the backend is still synthesizing
+            print("🎶 Streamed audio link received.")
+            audio_store.put_stream(call_sid, turn, audio)
+            updates.update(audio_turn=turn, audio_source=audio, audio_inline=None)
+        else:
+            print("🎶 Base64 audio received. Keeping it in the audio store...")
+            audio_store.put(call_sid, turn, base64.b64decode(audio))
+            updates.update(audio_turn=turn, audio_source=None, audio_inline=audio)
+
+        updates.update(
+            job_status="ready",
+            old_response_summary=res.get("old_response_summary", data["old_response_summary"]),
+            conversation_state=res.get("conversation_state", data["conversation_state"]),
         )
-
-        response.say("We did not hear anything. Goodbye.")
-
-        return Response(content=str(response), media_type="application/xml")
+        return updates["job_status"]
+    except BackendUnavailable as e:
+        print(f"❌ Flask service unavailable: {e}")
+        return updates["job_status"]
     except Exception as e:
         print("NEW ERROR: ", e)
+        return updates["job_status"]
+    finally:
+        await update_call_session(call_sid, **updates)
+        _jobs.pop((call_sid, turn), None)
+
+
+@service_router.post("/service")
+async def get_service(request: Request):
+    form = await request.form()
+    call_sid = form.get("CallSid")
+
+    print("🔍 Retrieving prompt and endpoint values from the call session...")
+    session = await get_call_session(call_sid)
+    language = session.get("language")
+    if not language or "prompt" not in session or "endpoint" not in session:
+        # Session expired (TTL) or lost: nothing to answer, so start the call over
+        return _xml(restart_at_language_menu(VoiceResponse(), request.base_url))
+    if not session["endpoint"]:
+        return _xml(_busy_twiml(request))
+    turn = session.get("turn", 0) + 1
+
+    data = {
+        "prompt": session["prompt"],
+        "language": language,
+        "old_response_summary": session.get("old_response_summary", ""),
+        "conversation_state": session.get("conversation_state", {}),
+        "audio_format": "stream",
+    }
+
+    await update_call_session(call_sid, turn=turn, job_turn=turn, job_status="pending")
+    cookies = dict(session.get("backend_cookies") or {})
+    job = asyncio.create_task(_run_service_job(call_sid, turn, session["endpoint"], data, cookies))
+    _jobs[(call_sid, turn)] = job
+
+    # Fast answers (cache hits, short replies) skip the hold loop entirely
+    done, _ = await asyncio.wait({job}, timeout=SERVICE_FAST_PATH_SECONDS)
+    if done:
+        if job.result() == "ready":
+            return _xml(_answer_twiml(request, call_sid, turn, language))
+        return _xml(_busy_twiml(request))
+
+    return _xml(_hold_twiml(request, turn, 0))
+
+
+@service_router.post("/service/poll")
+async def poll_service(request: Request, turn: int, poll: int = 0):
+    form = await request.form()
+    call_sid = form.get("CallSid")
+
+    session = await get_call_session(call_sid)
+    if not session:
+        return _xml(restart_at_language_menu(VoiceResponse(), request.base_url))
+    status = session.get("job_status") if session.get("job_turn") == turn else None
+
+    if status == "ready":
+        return _xml(_answer_twiml(request, call_sid, turn, session.get("language", "english")))
+    if status == "failed" or status is None or poll >= SERVICE_MAX_POLLS:
+        return _xml(_busy_twiml(request))
+
+    return _xml(_hold_twiml(request, turn, poll))
+
+
+@service_router.get("/hold-music/{index}.mp3")
+def get_hold_music(index: int):
+    segment = hold_music_segment(index)
+    if segment is None:
+        return Response(content="Hold music not available.", status_code=404)
+    return Response(
+        content=segment,
+        media_type="audio/mpeg",
+        headers={"Content-Length": str(len(segment)), "Cache-Control": "public, max-age=86400"},
+    )
@@ -0,0 +1,97 @@
+"""Event-loop latency while N callers fetch their recordings at once.
+
+Compares the old blocking fetch (time.sleep + requests.get inside the
+handler) with the pooled async fetcher. Run from the ivr-server directory:
+
+    python -m benchmarks.recording_fetch --calls 20 --ready-after 0.5
+"""
+import time
+import asyncio
+import argparse
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import httpx
+import requests
+from app.helpers.recordings import fetch_recording
+
+RECORDING = b"RIFF" + b"\0" * 64_000
+
+
+def start_fake_twilio(ready_after: float) -> ThreadingHTTPServer:
+    created = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            first_seen = created.setdefault(self.path, time.monotonic())
+            if time.monotonic() - first_seen < ready_after:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(RECORDING)))
+            self.end_headers()
+            self.wfile.write(RECORDING)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def measure_lag(stop: asyncio.Event, samples: list):
+    interval = 0.01
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - started - interval) * 1000)
+
+
+async def blocking_call(url: str, fixed_sleep: float):
+    time.sleep(fixed_sleep)
+    requests.get(url)
+
+
+async def async_call(url: str, client: httpx.AsyncClient):
+    await fetch_recording(url, client=client)
+
+
+async def run(name, make_call, calls):
+    stop = asyncio.Event()
+    lag = []
+    ticker = asyncio.create_task(measure_lag(stop, lag))
+    started = time.perf_counter()
+    await asyncio.gather(*(make_call(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await ticker
+
+    lag = lag or [0.0]
+    p99 = sorted(lag)[int(len(lag) * 0.99) - 1] if len(lag) > 1 else lag[0]
+    print(
+        f"{name:>9}: total {elapsed:6.2f}s | loop lag mean {statistics.mean(lag):8.1f} ms, "
+        f"p99 {p99:8.1f} ms, max {max(lag):8.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=20)
+    parser.add_argument("--ready-after", type=float, default=0.5, help="seconds until a recording exists")
+    parser.add_argument("--fixed-sleep", type=float, default=3.0, help="the old handler's time.sleep")
+    args = parser.parse_args()
+
+    server = start_fake_twilio(args.ready_after)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    await run("blocking", lambda i: blocking_call(f"{base}/old/{i}.wav", args.fixed_sleep), args.calls)
+    async with httpx.AsyncClient() as client:
+        await run("async", lambda i: async_call(f"{base}/new/{i}.wav", client), args.calls)
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+import io
+import wave
+import struct
+import numpy as np
+import pytest
+from app.helpers.audio import decode_wav, resample, WAVE_FORMAT_MULAW
+
+
+def make_wav(frames: bytes, channels: int = 1, sample_width: int = 2, rate: int = 8000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(sample_width)
+        f.setframerate(rate)
+        f.writeframes(frames)
+    return buffer.getvalue()
+
+
+def make_raw_wav(audio_format: int, bits: int, payload: bytes, channels: int = 1, rate: int = 8000,
+                 data_size: int | None = None) -> bytes:
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", audio_format, channels, rate, rate * block_align, block_align, bits)
+    size = len(payload) if data_size is None else data_size
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", size) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def test_decodes_16_bit_pcm():
+    pcm = np.array([0, 16384, -16384, 32767, -32768], dtype="<i2")
+    samples, rate = decode_wav(make_wav(pcm.tobytes()))
+
+    assert rate == 8000
+    assert samples.dtype == np.float32
+    np.testing.assert_allclose(samples, pcm / 32768.0)
+
+
+def test_averages_stereo_to_mono():
+    pcm = np.array([16384, 0, -16384, -16384], dtype="<i2")  # two stereo frames
+    samples, _ = decode_wav(make_wav(pcm.tobytes(), channels=2))
+
+    np.testing.assert_allclose(samples, [0.25, -0.5])
+
+
+def test_decodes_8_bit_unsigned_pcm():
+    samples, _ = decode_wav(make_wav(bytes([128, 255, 0]), sample_width=1))
+
+    np.testing.assert_allclose(samples, [0.0, 127 / 128, -1.0])
+
+
+def test_decodes_mulaw():
+    # 0xFF and 0x7F are the two zeros; 0x80 / 0x00 are the loudest positive / negative codes
+    samples, _ = decode_wav(make_raw_wav(WAVE_FORMAT_MULAW, 8, bytes([0xFF, 0x7F, 0x80, 0x00])))
+
+    np.testing.assert_allclose(samples, [0.0, 0.0, 32124 / 32768, -32124 / 32768])
+
+
+def test_streamed_data_size_placeholder_is_clipped():
+    pcm = np.array([1000, -1000], dtype="<i2")
+    samples, _ = decode_wav(make_raw_wav(1, 16, pcm.tobytes(), data_size=0xFFFFFFFF))
+
+    np.testing.assert_allclose(samples, pcm / 32768.0)
+
+
+def test_rejects_non_wave_input():
+    with pytest.raises(ValueError):
+        decode_wav(b"ID3\x03\x00\x00\x00\x00\x00\x00")
+
+
+def test_rejects_unsupported_encoding():
+    with pytest.raises(ValueError):
+        decode_wav(make_raw_wav(1, 24, b"\x00" * 6))
+
+
+def test_resample_doubles_telephony_rate():
+    samples = np.linspace(-1, 1, 80, dtype=np.float32)
+    resampled = resample(samples, 8000, 16000)
+
+    assert resampled.size == 160
+    assert resampled[0] == pytest.approx(-1.0)
+    assert resampled[-1] == pytest.approx(1.0)
@@ -0,0 +1,63 @@
+from app.routes.audio import _ranged_response
+
+AUDIO = bytes(range(10))
+
+
+def test_no_range_returns_whole_file():
+    response = _ranged_response(AUDIO, None)
+
+    assert response.status_code == 200
+    assert response.body == AUDIO
+    assert response.headers["content-length"] == "10"
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_closed_range():
+    response = _ranged_response(AUDIO, "bytes=2-5")
+
+    assert response.status_code == 206
+    assert response.body == AUDIO[2:6]
+    assert response.headers["content-range"] == "bytes 2-5/10"
+    assert response.headers["content-length"] == "4"
+
+
+def test_open_ended_range():
+    response = _ranged_response(AUDIO, "bytes=7-")
+
+    assert response.status_code == 206
+    assert response.body == AUDIO[7:]
+    assert response.headers["content-range"] == "bytes 7-9/10"
+
+
+def test_suffix_range():
+    response = _ranged_response(AUDIO, "bytes=-3")
+
+    assert response.status_code == 206
+    assert response.body == AUDIO[-3:]
+    assert response.headers["content-range"] == "bytes 7-9/10"
+
+
+def test_end_past_the_file_is_clamped():
+    response = _ranged_response(AUDIO, "bytes=8-100")
+
+    assert response.status_code == 206
+    assert response.body == AUDIO[8:]
+    assert response.headers["content-range"] == "bytes 8-9/10"
+
+
+def test_unsatisfiable_range():
+    response = _ranged_response(AUDIO, "bytes=10-12")
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */10"
+
+
+def test_inverted_range_is_unsatisfiable():
+    assert _ranged_response(AUDIO, "bytes=5-2").status_code == 416
+
+
+def test_malformed_or_multi_range_falls_back_to_whole_file():
+    for header in ("bytes=-", "items=0-1", "bytes=0-1,4-5"):
+        response = _ranged_response(AUDIO, header)
+        assert response.status_code == 200
+        assert response.body == AUDIO
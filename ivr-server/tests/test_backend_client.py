@@ -0,0 +1,168 @@
+import asyncio
+import httpx
+import pytest
+from app.helpers import backend_client
+from app.helpers.backend_client import CircuitBreaker, BackendUnavailable, post_backend
+
+
+# -----------------------------
+# CircuitBreaker
+# -----------------------------
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_admits_a_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60  # reset timeout elapsed
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def test_released_trial_lets_the_next_request_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.release_trial()
+    assert breaker.allow()
+
+
+# -----------------------------
+# post_backend against a mock backend
+# -----------------------------
+@pytest.fixture
+def backend(monkeypatch):
+    """Route the shared client to `handler`; returns the list of requests it saw."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.path == "/language/set-language":
+            return httpx.Response(200, json={"status": "success"}, headers={"Set-Cookie": "session=caller-a; HttpOnly; Path=/"})
+        if request.url.path == "/not-json":
+            return httpx.Response(405, text="<html>Method Not Allowed</html>")
+        if request.url.path == "/error":
+            return httpx.Response(500, json={"status": "error"})
+        if request.url.path == "/down":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"status": "success"})
+
+    real_client = httpx.AsyncClient
+    monkeypatch.setattr(
+        backend_client.httpx, "AsyncClient",
+        lambda **kwargs: real_client(transport=httpx.MockTransport(handler), **kwargs),
+    )
+    monkeypatch.setattr(backend_client, "_client", None)
+    monkeypatch.setattr(backend_client, "_limit", None)
+    monkeypatch.setattr(backend_client, "breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    return seen
+
+
+def run(coro):
+    async def main():
+        try:
+            return await coro
+        finally:
+            await backend_client.close_backend_client()
+    return asyncio.run(main())
+
+
+def test_cookies_stay_with_their_call(backend):
+    async def scenario():
+        caller_a, caller_b = {}, {}
+        await post_backend("/language/set-language", {"language": "hindi"}, caller_a)
+        await post_backend("/scholarships/ask", {"prompt": "hi"}, caller_b)
+        await post_backend("/scholarships/ask", {"prompt": "hi"}, caller_a)
+        return caller_a, caller_b
+
+    caller_a, caller_b = run(scenario())
+
+    assert caller_a == {"session": "caller-a"}
+    assert caller_b == {}
+    assert "cookie" not in backend[1].headers
+    assert backend[2].headers["cookie"] == "session=caller-a"
+
+
+def test_client_errors_do_not_open_the_circuit(backend):
+    async def scenario():
+        for _ in range(5):
+            with pytest.raises(BackendUnavailable):
+                await post_backend("/not-json", {})
+
+    run(scenario())
+    assert backend_client.breaker.state == "closed"
+
+
+def test_server_and_transport_errors_open_the_circuit(backend):
+    async def scenario():
+        for path in ("/error", "/down"):
+            with pytest.raises(BackendUnavailable):
+                await post_backend(path, {})
+        with pytest.raises(BackendUnavailable):
+            await post_backend("/scholarships/ask", {})
+
+    run(scenario())
+    assert backend_client.breaker.state == "open"
+    assert [request.url.path for request in backend] == ["/error", "/down"]
+
+
+def test_empty_endpoint_is_rejected_before_any_request(backend):
+    async def scenario():
+        with pytest.raises(BackendUnavailable):
+            await post_backend("", {})
+
+    run(scenario())
+    assert backend == []
+    assert backend_client.breaker.failures == 0
+
+
+def test_cancelled_trial_does_not_wedge_the_breaker(monkeypatch, backend):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    monkeypatch.setattr(backend_client, "breaker", breaker)
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(60)
+
+    async def scenario():
+        monkeypatch.setattr(backend_client.get_backend_client(), "post", hang)
+        trial = asyncio.ensure_future(post_backend("/scholarships/ask", {}))
+        await asyncio.sleep(0)
+        assert breaker.trial_in_flight
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    run(scenario())
+    assert not breaker.trial_in_flight
+    assert breaker.allow()